@@ -2,7 +2,7 @@
 帳號發現和映射 API 端點
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
@@ -11,10 +11,13 @@ from datetime import datetime
 from app.core.activitypub.account_discovery import (
     AccountDiscoveryService, AccountMappingService, AccountSyncService
 )
-from app.core.graphql_client import GraphQLClient
+from app.core.graphql_client import MAX_LIST_TAKE, get_graphql_client
 
 router = APIRouter()
 
+# 列表端點單頁上限，避免一次取回過大的 GraphQL 回應
+MAX_PAGE_SIZE = MAX_LIST_TAKE
+
 # Pydantic 模型
 class AccountDiscoveryRequest(BaseModel):
     method: str  # username, email, profile_url, auto
@@ -139,11 +142,11 @@ async def discover_account(
 @router.get("/discoveries", response_model=List[Dict[str, Any]])
 async def get_account_discoveries(
     member_id: str,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
 ):
     """取得帳號發現記錄"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     discoveries = await gql.list_account_discoveries(member_id, limit, offset)
     return discoveries
 
@@ -235,7 +238,7 @@ async def get_account_mapping(
     member_id: str,
 ):
     """取得特定帳號映射（透過 GraphQL）"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     mapping = await gql.get_account_mapping_by_id(str(mapping_id))
     if not mapping or mapping.get("mesh_member", {}).get("id") != member_id:
         raise HTTPException(status_code=404, detail="Account mapping not found")
@@ -274,7 +277,7 @@ async def update_account_mapping(
     """更新帳號映射設定"""
     mapping_service = AccountMappingService(None)
     
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     mapping = await gql.get_account_mapping_by_id(str(mapping_id))
     if not mapping or mapping.get("mesh_member", {}).get("id") != member_id:
         raise HTTPException(status_code=404, detail="Account mapping not found")
@@ -323,7 +326,7 @@ async def verify_account_mapping(
     """驗證帳號映射"""
     mapping_service = AccountMappingService(None)
     
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     mapping = await gql.get_account_mapping_by_id(str(mapping_id))
     if not mapping or mapping.get("mesh_member", {}).get("id") != member_id:
         raise HTTPException(status_code=404, detail="Account mapping not found")
@@ -343,7 +346,7 @@ async def delete_account_mapping(
     """刪除帳號映射"""
     mapping_service = AccountMappingService(db)
     
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     mapping = await gql.get_account_mapping_by_id(str(mapping_id))
     if not mapping or mapping.get("mesh_member", {}).get("id") != member_id:
         raise HTTPException(status_code=404, detail="Account mapping not found")
@@ -363,7 +366,7 @@ async def sync_account_content(
 ):
     """同步帳號內容"""
     # 檢查映射是否屬於該 Member
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     mapping = await gql.get_account_mapping_by_id(str(mapping_id))
     if mapping and mapping.get("mesh_member", {}).get("id") != member_id:
         mapping = None
@@ -399,12 +402,12 @@ async def sync_account_content(
 async def get_sync_tasks(
     mapping_id: int,
     member_id: str,
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
 ):
     """取得同步任務列表"""
     # 檢查映射是否屬於該 Member
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     mapping = await gql.get_account_mapping_by_id(str(mapping_id))
     if mapping and mapping.get("mesh_member", {}).get("id") != member_id:
         mapping = None
@@ -437,7 +440,7 @@ async def get_sync_task(
     member_id: str,
 ):
     """取得特定同步任務"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     task = await gql.get_account_sync_task(str(task_id))
     if not task or task.get("mapping", {}).get("id") != str(mapping_id):
         raise HTTPException(status_code=404, detail="Sync task not found")
@@ -4,7 +4,7 @@ from pydantic import BaseModel
 
 from app.core.activitypub.utils import generate_key_pair, create_actor_object
 from app.core.config import settings
-from app.core.graphql_client import GraphQLClient
+from app.core.graphql_client import get_graphql_client
 
 router = APIRouter()
 
@@ -32,13 +32,13 @@ async def list_actors():
 @router.post("/", response_model=ActorResponse)
 async def create_actor(actor_data: ActorCreate):
     """建立新 Actor"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     existing = await gql.get_actor_by_username(actor_data.username)
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
     
     # 生成金鑰對
-    public_key, private_key = generate_key_pair()
+    public_key, private_key = await generate_key_pair()
     
     data = {
         "username": actor_data.username,
@@ -71,7 +71,7 @@ async def create_actor(actor_data: ActorCreate):
 @router.get("/{username}")
 async def get_actor(username: str):
     """取得特定 Actor 資訊"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     actor = await gql.get_actor_by_username(username)
     if not actor:
         raise HTTPException(status_code=404, detail="Actor not found")
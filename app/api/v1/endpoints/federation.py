@@ -2,12 +2,12 @@
 聯邦網站管理 API 端點
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
 
-from app.core.graphql_client import GraphQLClient
+from app.core.graphql_client import get_graphql_client
 from app.core.activitypub.federation_discovery import FederationDiscovery, FederationManager
 
 router = APIRouter()
@@ -76,13 +76,13 @@ class DiscoveryResponse(BaseModel):
 
 @router.get("/instances", response_model=List[FederationInstanceResponse])
 async def get_federation_instances(
-    limit: int = 100,
-    offset: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     approved_only: bool = False,
     active_only: bool = True,
 ):
     """取得聯邦實例列表"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     instances = await gql.list_federation_instances(limit, offset, approved_only, active_only)
     
     return [
@@ -115,7 +115,7 @@ async def get_federation_instances(
 @router.get("/instances/{domain}", response_model=FederationInstanceResponse)
 async def get_federation_instance(domain: str):
     """取得特定聯邦實例資訊"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     instance = await gql.get_federation_instance(domain)
     if not instance:
         raise HTTPException(status_code=404, detail="Federation instance not found")
@@ -148,7 +148,7 @@ async def create_federation_instance(
     instance_data: FederationInstanceCreate,
 ):
     """手動建立聯邦實例"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     exists = await gql.get_federation_instance(instance_data.domain)
     if exists:
         raise HTTPException(status_code=400, detail="Federation instance already exists")
@@ -198,7 +198,7 @@ async def update_federation_instance(
     update_data: FederationInstanceUpdate,
 ):
     """更新聯邦實例設定"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     instance = await gql.get_federation_instance(domain)
     if not instance:
         raise HTTPException(status_code=404, detail="Federation instance not found")
@@ -256,7 +256,7 @@ async def block_federation_instance(domain: str):
 @router.post("/instances/{domain}/test")
 async def test_federation_instance(domain: str):
     """測試聯邦實例連接"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     instance = await gql.get_federation_instance(domain)
     if not instance:
         raise HTTPException(status_code=404, detail="Federation instance not found")
@@ -336,7 +336,7 @@ async def test_all_connections(background_tasks: BackgroundTasks):
 @router.delete("/instances/{domain}")
 async def delete_federation_instance(domain: str):
     """刪除聯邦實例"""
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     inst = await gql.get_federation_instance(domain)
     if not inst:
         raise HTTPException(status_code=404, detail="Federation instance not found")
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from fastapi.responses import ORJSONResponse
-from app.core.graphql_client import GraphQLClient
+from app.core.graphql_client import get_graphql_client
 
 router = APIRouter()
 
@@ -9,7 +9,7 @@ async def health_check():
     """Health check endpoint"""
     gql_status = "healthy"
     try:
-        gql = GraphQLClient()
+        gql = get_graphql_client()
         await gql.query("query __Ping { __typename }")
     except Exception as e:
         gql_status = f"unhealthy: {str(e)}"
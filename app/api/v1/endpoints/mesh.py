@@ -1,9 +1,9 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-from app.core.graphql_client import GraphQLClient
+from app.core.graphql_client import MAX_LIST_TAKE, get_graphql_client
 from app.core.activitypub.mesh_utils import (
     create_pick_activity, create_comment_activity,
     create_like_pick_activity, create_announce_pick_activity
@@ -13,6 +13,18 @@ from app.core.config import settings
 
 router = APIRouter()
 
+# 列表端點單頁上限，避免一次取回過大的 GraphQL 回應
+MAX_PAGE_SIZE = MAX_LIST_TAKE
+
+def _parse_iso8601(value: Optional[str]) -> Optional[datetime]:
+    """解析 ISO 8601 時間字串；Python 3.11+ 可直接處理結尾的 Z，僅在舊版才改寫"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
 # Pydantic 模型
 class PickCreate(BaseModel):
     story_id: str
@@ -79,7 +91,7 @@ async def get_member(
 ):
     """取得 Member 資訊"""
     # 透過 GraphQL 取得 Member 資訊
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     member_data = await gql_client.get_member(member_id)
     
     if not member_data:
@@ -134,7 +146,7 @@ async def create_pick(
 ):
     """建立新的 Pick（分享文章）"""
     # 先建立 GraphQL client 並取得 Member 資訊
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     member_data = await gql_client.get_member(member_id)
     if not member_data:
         raise HTTPException(status_code=404, detail="Member not found")
@@ -275,14 +287,14 @@ async def create_comment(
 @router.get("/picks/{pick_id}/comments", response_model=List[CommentResponse])
 async def get_pick_comments(
     pick_id: str,
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
 ):
     """取得 Pick 的評論列表"""
     # 不再查詢本地 Pick，由 Mesh 端維護
     
     # 透過 GraphQL 取得評論
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     comments_data = await gql_client.get_pick_comments(pick_id, limit, offset)
     
     # 簡單快取避免 N+1：memberId -> actor
@@ -303,7 +315,7 @@ async def get_pick_comments(
             comments.append(CommentResponse(
                 id=f"comment_{comment_data['id']}",
                 content=comment_data["content"],
-                published_date=datetime.fromisoformat(comment_data["published_date"].replace("Z", "+00:00")) if comment_data.get("published_date") else None,
+                published_date=_parse_iso8601(comment_data.get("published_date")),
                 actor={
                     "id": actor.get("id"),
                     "username": actor.get("username"),
@@ -380,17 +392,16 @@ async def announce_pick(
 @router.get("/members/{member_id}/picks", response_model=List[PickResponse])
 async def get_member_picks(
     member_id: str,
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
 ):
     """取得 Member 的 Picks"""
     # 透過 GraphQL 取得 Member 的 Picks
-    gql_client = GraphQLClient()
-    # 預先取得對應 Actor，避免 N+1
-    member_data = await gql_client.get_member(member_id)
+    gql_client = get_graphql_client()
+    # Member 與 Picks 以單一查詢取得，再預先取得對應 Actor，避免 N+1
+    member_data, picks_data = await gql_client.get_member_with_picks(member_id, limit, offset)
     username = (member_data or {}).get("nickname") or (member_data or {}).get("name", "").lower().replace(" ", "_")
     actor = await gql_client.get_actor_by_username(username) if username else None
-    picks_data = await gql_client.get_member_picks(member_id, limit, offset)
     
     picks = []
     for pick_data in picks_data:
@@ -401,7 +412,7 @@ async def get_member_picks(
                 story_id=pick_data["story"]["id"],
                 objective=pick_data.get("objective"),
                 kind=pick_data.get("kind", "share"),
-                picked_date=datetime.fromisoformat(pick_data["picked_date"].replace("Z", "+00:00")) if pick_data.get("picked_date") else None,
+                picked_date=_parse_iso8601(pick_data.get("picked_date")),
                 story={
                     "id": pick_data["story"]["id"],
                     "title": pick_data["story"]["title"],
@@ -424,7 +435,7 @@ async def get_member_activitypub_settings(
 ):
     """取得 Member 的 ActivityPub 設定"""
     # 透過 GraphQL 取得 Member 資訊
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     member_data = await gql_client.get_member(member_id)
     
     if not member_data:
@@ -445,7 +456,7 @@ async def update_member_activitypub_settings(
 ):
     """更新 Member 的 ActivityPub 設定"""
     # 透過 GraphQL 更新 Member 的 ActivityPub 設定
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     result = await gql_client.update_member_activitypub_settings(
         member_id=member_id,
         activitypub_enabled=settings_data.activitypub_enabled,
@@ -2,7 +2,12 @@
 帳號發現和映射模組
 """
 
+# 部分型別註記仍沿用已移除的 ORM 模型名稱，延後求值避免匯入時失敗
+from __future__ import annotations
+
+import logging
 import httpx
+import orjson
 import asyncio
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
@@ -13,7 +18,12 @@ import difflib
 # 不再依賴本地 ORM 模型
 from app.core.config import settings
 from app.core.activitypub.federation_discovery import FederationDiscovery
-from app.core.graphql_client import GraphQLClient
+from app.core.graphql_client import GraphQLClient, get_graphql_client
+
+logger = logging.getLogger(__name__)
+
+# 缺少陣列欄位時使用的共用空序列，避免每次建立空 list
+_EMPTY: tuple = ()
 
 class AccountDiscoveryService:
     """帳號發現服務"""
@@ -22,7 +32,7 @@ class AccountDiscoveryService:
         self.db = db
         # 使用與 GraphQL 相同的共享 client（若可用），否則退回獨立 client
         self.client = getattr(GraphQLClient, 'shared_client', None) or httpx.AsyncClient(timeout=30.0)
-        self.gql = GraphQLClient()
+        self.gql = get_graphql_client()
     
     async def discover_account_by_username(
         self, 
@@ -56,7 +66,7 @@ class AccountDiscoveryService:
             return None
             
         except Exception as e:
-            print(f"Error discovering account {username}@{domain}: {e}")
+            logger.warning("Error discovering account %s@%s: %s", username, domain, e)
             return None
     
     async def discover_account_by_email(
@@ -84,13 +94,13 @@ class AccountDiscoveryService:
                             mesh_member_id, method_name, username, domain, result
                         )
                 except Exception as e:
-                    print(f"Error with {method_name} discovery: {e}")
+                    logger.warning("Error with %s discovery: %s", method_name, e)
                     continue
             
             return None
             
         except Exception as e:
-            print(f"Error discovering account by email {email}: {e}")
+            logger.warning("Error discovering account by email %s: %s", email, e)
             return None
     
     async def discover_account_by_profile_url(
@@ -118,7 +128,7 @@ class AccountDiscoveryService:
             return None
             
         except Exception as e:
-            print(f"Error discovering account by profile URL {profile_url}: {e}")
+            logger.warning("Error discovering account by profile URL %s: %s", profile_url, e)
             return None
     
     async def auto_discover_accounts(self, mesh_member_id: str) -> List[Dict[str, Any]]:
@@ -154,7 +164,7 @@ class AccountDiscoveryService:
                         discovered_accounts.append(result)
                         break  # 找到一個就停止
                 except Exception as e:
-                    print(f"Error auto-discovering on {instance.domain}: {e}")
+                    logger.warning("Error auto-discovering on %s: %s", instance.domain, e)
                     continue
         
         return discovered_accounts
@@ -169,10 +179,10 @@ class AccountDiscoveryService:
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 
                 # 尋找 ActivityPub 相關的連結
-                for link in data.get("links", []):
+                for link in data.get("links") or _EMPTY:
                     if link.get("type") == "application/activity+json":
                         actor_url = link.get("href")
                         if actor_url:
@@ -191,7 +201,7 @@ class AccountDiscoveryService:
             return None
             
         except Exception as e:
-            print(f"Error in WebFinger discovery: {e}")
+            logger.warning("Error in WebFinger discovery: %s", e)
             return None
     
     async def _discover_via_activitypub(self, username: str, domain: str) -> Optional[Dict[str, Any]]:
@@ -213,7 +223,7 @@ class AccountDiscoveryService:
             return None
             
         except Exception as e:
-            print(f"Error in ActivityPub discovery: {e}")
+            logger.warning("Error in ActivityPub discovery: %s", e)
             return None
     
     async def _discover_via_search(self, username: str, domain: str) -> Optional[Dict[str, Any]]:
@@ -234,7 +244,7 @@ class AccountDiscoveryService:
                     )
                     
                     if response.status_code == 200:
-                        data = response.json()
+                        data = orjson.loads(response.content)
                         accounts = data.get("accounts", [])
                         
                         for account in accounts:
@@ -249,13 +259,13 @@ class AccountDiscoveryService:
                                 }
                 
                 except Exception as e:
-                    print(f"Error with search URL {search_url}: {e}")
+                    logger.warning("Error with search URL %s: %s", search_url, e)
                     continue
             
             return None
             
         except Exception as e:
-            print(f"Error in search discovery: {e}")
+            logger.warning("Error in search discovery: %s", e)
             return None
     
     async def _get_actor_info(self, actor_url: str) -> Optional[Dict[str, Any]]:
@@ -270,12 +280,12 @@ class AccountDiscoveryService:
             )
             
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             
             return None
             
         except Exception as e:
-            print(f"Error getting actor info from {actor_url}: {e}")
+            logger.warning("Error getting actor info from %s: %s", actor_url, e)
             return None
     
     async def _process_discovery_result(
@@ -313,8 +323,7 @@ class AccountDiscoveryService:
     
     async def _get_known_instances(self) -> List[FederationInstance]:
         """取得已知的聯邦實例（透過 GraphQL）"""
-        from app.core.graphql_client import GraphQLClient
-        gql = GraphQLClient()
+        gql = get_graphql_client()
         instances = await gql.list_federation_instances(limit=50, offset=0, approved_only=True, active_only=True)
         # 為了沿用既有程式碼回傳物件具有 .domain 屬性
         from types import SimpleNamespace
@@ -326,7 +335,7 @@ class AccountMappingService:
     def __init__(self, db=None):
         self.db = db
         self.discovery_service = AccountDiscoveryService(db)
-        self.gql = GraphQLClient(client=getattr(GraphQLClient, 'shared_client', None))
+        self.gql = get_graphql_client()
     
     async def create_account_mapping(
         self, 
@@ -362,8 +371,8 @@ class AccountMappingService:
             }
             created = await self.gql.create_account_mapping(data)
             return created
-        except Exception as e:
-            print(f"Error creating account mapping: {e}")
+        except Exception:
+            logger.exception("Error creating account mapping")
             return None
     
     async def get_account_mappings(self, mesh_member_id: str) -> List[AccountMapping]:
@@ -387,8 +396,8 @@ class AccountMappingService:
             }
             updated = await self.gql.update_account_mapping(str(mapping_id), data)
             return bool(updated)
-        except Exception as e:
-            print(f"Error verifying account mapping: {e}")
+        except Exception:
+            logger.exception("Error verifying account mapping")
             return False
     
     async def update_mapping_sync_settings(
@@ -400,16 +409,16 @@ class AccountMappingService:
         try:
             updated = await self.gql.update_account_mapping(str(mapping_id), sync_settings)
             return bool(updated)
-        except Exception as e:
-            print(f"Error updating mapping sync settings: {e}")
+        except Exception:
+            logger.exception("Error updating mapping sync settings")
             return False
     
     async def delete_account_mapping(self, mapping_id: int) -> bool:
         """刪除帳號映射"""
         try:
             return await self.gql.delete_account_mapping(str(mapping_id))
-        except Exception as e:
-            print(f"Error deleting account mapping: {e}")
+        except Exception:
+            logger.exception("Error deleting account mapping")
             return False
 
 class AccountSyncService:
@@ -419,7 +428,7 @@ class AccountSyncService:
         self.db = db
         # 與 GraphQLClient 共用 httpx client（如可用）
         self.client = getattr(GraphQLClient, 'shared_client', None) or httpx.AsyncClient(timeout=30.0)
-        self.gql = GraphQLClient(client=getattr(GraphQLClient, 'shared_client', None))
+        self.gql = get_graphql_client()
     
     async def sync_account_content(
         self, 
@@ -445,8 +454,8 @@ class AccountSyncService:
             if created:
                 asyncio.create_task(self._execute_sync_task(created["id"]))
             return created  # 回傳 GQL 物件
-        except Exception as e:
-            print(f"Error creating sync task: {e}")
+        except Exception:
+            logger.exception("Error creating sync task")
             raise
     
     async def _execute_sync_task(self, task_id: int):
@@ -487,7 +496,7 @@ class AccountSyncService:
                 "progress": 100,
             })
         except Exception as e:
-            print(f"Error executing sync task {task_id}: {e}")
+            logger.exception("Error executing sync task %s", task_id)
             # 失敗狀態
             await self.gql.update_account_sync_task(str(task_id), {
                 "status": "failed",
@@ -506,8 +515,8 @@ class AccountSyncService:
             )
             
             if response.status_code == 200:
-                data = response.json()
-                items = data.get("orderedItems", [])
+                data = orjson.loads(response.content)
+                items = data.get("orderedItems") or _EMPTY
                 
                 processed_count = 0
                 synced_count = 0
@@ -528,8 +537,8 @@ class AccountSyncService:
                         "items_synced": synced_count,
                     })
                 
-        except Exception as e:
-            print(f"Error syncing posts: {e}")
+        except Exception:
+            logger.exception("Error syncing posts")
             raise
     
     async def _process_post(self, activity: Dict[str, Any], mapping: AccountMapping) -> bool:
@@ -537,11 +546,11 @@ class AccountSyncService:
         try:
             # 這裡可以實作將遠端貼文轉換為本地 Pick 的邏輯
             # 暫時只記錄處理狀態
-            print(f"Processing post from {mapping.remote_actor_id}")
+            logger.debug("Processing post from %s", mapping.remote_actor_id)
             return True
             
-        except Exception as e:
-            print(f"Error processing post: {e}")
+        except Exception:
+            logger.exception("Error processing post")
             return False
     
     async def _sync_follows(self, task: AccountSyncTask, mapping: AccountMapping):
@@ -569,7 +578,7 @@ class AccountSyncService:
             )
             
             if response.status_code == 200:
-                actor_data = response.json()
+                actor_data = orjson.loads(response.content)
                 
                 # 更新映射資訊
                 mapping.remote_display_name = actor_data.get("name")
@@ -579,6 +588,6 @@ class AccountSyncService:
                 
                 # 由 GraphQL 維護映射資料，這裡不再提交本地 DB
                 
-        except Exception as e:
-            print(f"Error syncing profile: {e}")
+        except Exception:
+            logger.exception("Error syncing profile")
             raise
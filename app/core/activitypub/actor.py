@@ -1,12 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
-import json
-from app.core.graphql_client import GraphQLClient
-from app.core.config import settings
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+from app.core.graphql_client import get_graphql_client
+from app.core.config import AP_BASE
 from app.core.activitypub.utils import generate_actor_id, create_actor_object
 from fastapi.responses import ORJSONResponse
 
-actor_router = APIRouter()
+actor_router = APIRouter(default_response_class=ORJSONResponse)
 
 @actor_router.get("/{username}", response_class=ORJSONResponse)
 async def get_actor(
@@ -14,7 +16,7 @@ async def get_actor(
 ):
     """Get Actor information（改為透過 GraphQL）"""
     # Query Actor via GraphQL
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     actor = await gql_client.get_actor_by_username(username)
     
     if not actor:
@@ -31,7 +33,7 @@ async def get_followers(
 ):
     """Get followers list（改為透過 GraphQL）"""
     # Query Actor via GraphQL
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     actor = await gql_client.get_actor_by_username(username)
     
     if not actor:
@@ -43,7 +45,7 @@ async def get_followers(
     
     return {
         "@context": "https://www.w3.org/ns/activitystreams",
-        "id": f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{username}/followers",
+        "id": f"{AP_BASE}/users/{username}/followers",
         "type": "OrderedCollection",
         "totalItems": len(followers),
         "orderedItems": followers
@@ -55,7 +57,7 @@ async def get_following(
 ):
     """Get following list（改為透過 GraphQL）"""
     # Query Actor via GraphQL
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     actor = await gql_client.get_actor_by_username(username)
     
     if not actor:
@@ -67,28 +69,95 @@ async def get_following(
     
     return {
         "@context": "https://www.w3.org/ns/activitystreams",
-        "id": f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{username}/following",
+        "id": f"{AP_BASE}/users/{username}/following",
         "type": "OrderedCollection",
         "totalItems": len(following),
         "orderedItems": following
     }
 
+# Outbox 以 (created_at, id) keyset 分頁，cursor 為 base64url("<created_at>|<id>")
+OUTBOX_PAGE_SIZE = 20
+OUTBOX_MAX_PAGE_SIZE = 50
+
+def _encode_outbox_cursor(created_at: str, item_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{item_id}".encode()).decode()
+
+def _decode_outbox_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, item_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, item_id
+
 @actor_router.get("/{username}/outbox", response_class=ORJSONResponse)
 async def get_outbox(
     username: str,
+    request: Request,
 ):
-    """Get outbox（改為透過 GraphQL）"""
+    """Get outbox（改為透過 GraphQL）；僅回傳集合資訊，項目由 first 指向的分頁提供
+
+    以 (actor, 最新一筆時間, 總數) 計算弱 ETag，內容未變時回傳 304。
+    """
     # Query Actor via GraphQL
-    gql_client = GraphQLClient()
+    gql_client = get_graphql_client()
     actor = await gql_client.get_actor_by_username(username)
     
     if not actor:
         raise HTTPException(status_code=404, detail="Actor not found")
     
-    return {
+    actor_id = generate_actor_id(username)
+    total_items, latest = await asyncio.gather(
+        gql_client.count_outbox_items(actor_id),
+        gql_client.list_outbox_items(actor_id, 1),
+    )
+    latest_at = latest[0].get("created_at") if latest else ""
+    digest = hashlib.blake2b(f"{actor_id}:{latest_at}:{total_items}".encode(), digest_size=8).hexdigest()
+    headers = {
+        "ETag": f'W/"{digest}"',
+        "Cache-Control": "public, max-age=60, stale-while-revalidate=300",
+    }
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and headers["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    
+    outbox_id = f"{AP_BASE}/users/{username}/outbox"
+    return ORJSONResponse({
         "@context": "https://www.w3.org/ns/activitystreams",
-        "id": f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{username}/outbox",
+        "id": outbox_id,
         "type": "OrderedCollection",
-        "totalItems": 0,  # TODO: Implement activity count
-        "orderedItems": []  # TODO: Implement activity list
+        "totalItems": total_items,
+        "first": f"{outbox_id}/page",
+    }, headers=headers)
+
+@actor_router.get("/{username}/outbox/page", response_class=ORJSONResponse)
+async def get_outbox_page(
+    username: str,
+    cursor: Optional[str] = None,
+    per_page: int = Query(OUTBOX_PAGE_SIZE, ge=1, le=OUTBOX_MAX_PAGE_SIZE),
+):
+    """Get one outbox page（keyset 分頁，依新到舊）"""
+    before = _decode_outbox_cursor(cursor) if cursor else None
+    
+    gql_client = get_graphql_client()
+    actor = await gql_client.get_actor_by_username(username)
+    
+    if not actor:
+        raise HTTPException(status_code=404, detail="Actor not found")
+    
+    outbox_id = f"{AP_BASE}/users/{username}/outbox"
+    # 多取一筆以判斷是否還有下一頁
+    items = await gql_client.list_outbox_items(generate_actor_id(username), per_page + 1, before)
+    has_next = len(items) > per_page
+    items = items[:per_page]
+    
+    page: Dict[str, Any] = {
+        "@context": "https://www.w3.org/ns/activitystreams",
+        "id": f"{outbox_id}/page?cursor={cursor}" if cursor else f"{outbox_id}/page",
+        "type": "OrderedCollectionPage",
+        "partOf": outbox_id,
+        "orderedItems": [item.get("activity_data") for item in items],
     }
+    if has_next:
+        last = items[-1]
+        page["next"] = f"{outbox_id}/page?cursor={_encode_outbox_cursor(last['created_at'], last['id'])}"
+    return page
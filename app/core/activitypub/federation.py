@@ -1,9 +1,60 @@
+import logging
 import httpx
 import asyncio
-from typing import Dict, Any, List, Optional
+import re
+import time
+import orjson
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 """Federation helpers (no local ORM dependency)"""
 from app.core.config import settings
 from app.core.activitypub.federation_discovery import FederationDiscovery
+from app.core.activitypub.utils import extract_username_from_actor_id
+from app.core.graphql_client import GraphQLClient, get_graphql_client
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+# 遠端 Actor 快取：actor_id -> (到期時間, actor 資料)，超過 ACTOR_CACHE_MAX_ENTRIES 時淘汰最久未使用者；
+# 同一 actor 的並行查詢共用一把鎖
+_actor_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_actor_locks: Dict[str, asyncio.Lock] = {}
+
+# 遠端 Actor 探索與活動投遞共用的 httpx client（延遲建立，應用關閉時由 close_federation_client 釋放）
+_http_client: Optional[httpx.AsyncClient] = None
+
+# 投遞活動的逾時較長（遠端收件匣可能同步處理）
+_DELIVERY_TIMEOUT = 30.0
+
+def get_federation_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # 連線失敗（connect 階段）由 transport 重試；已送出的請求不重試
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        )
+        _http_client = httpx.AsyncClient(
+            transport=transport,
+            timeout=10.0,
+            headers={
+                "Accept": "application/activity+json",
+                "User-Agent": "READr-Mesh-ActivityPub/1.0",
+            },
+        )
+    return _http_client
+
+async def close_federation_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def _dumps_activity(activity: Dict[str, Any]) -> bytes:
+    """以 orjson 序列化對外送出的活動；datetime 一律輸出為 UTC 並以 Z 結尾"""
+    return orjson.dumps(activity, option=orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC)
 
 async def federate_activity(activity: Dict[str, Any], db=None):
     """Send activity to federation network"""
@@ -17,15 +68,18 @@ async def federate_activity(activity: Dict[str, Any], db=None):
     discovery = FederationDiscovery(db)
     approved_instances = await discovery.get_approved_instances()
     
-    # Send to all approved instances in parallel
-    tasks = []
-    for instance in approved_instances:
-        if instance.is_active and not instance.is_blocked:
-            task = send_activity_to_instance(activity, instance, db)
-            tasks.append(task)
+    # Send to all approved instances in parallel（限制同時送出的數量）
+    targets = [
+        instance for instance in approved_instances
+        if instance.is_active and not instance.is_blocked
+    ]
     
-    if tasks:
-        await asyncio.gather(*tasks, return_exceptions=True)
+    if targets:
+        await GraphQLClient.map(
+            lambda instance: send_activity_to_instance(activity, instance, db),
+            targets,
+            return_exceptions=True,
+        )
 
 async def send_activity_to_instance(activity: Dict[str, Any], instance: Dict[str, Any], db=None):
     """Send activity to federation instance"""
@@ -34,24 +88,20 @@ async def send_activity_to_instance(activity: Dict[str, Any], instance: Dict[str
         if not (instance.get("auto_announce", True)):
             return
         
-        transport = httpx.AsyncHTTPTransport(retries=2)
-        async with httpx.AsyncClient(timeout=30.0, transport=transport) as client:
-            response = await client.post(
-                (instance.get("inbox_url") or f"https://{instance.get('domain')}/inbox"),
-                json=activity,
-                headers={
-                    "Content-Type": "application/activity+json",
-                    "User-Agent": f"READr-Mesh-ActivityPub/1.0"
-                }
-            )
-            
-            if response.status_code in [200, 202]:
-                print(f"Successfully sent activity to {instance.get('domain')}")
-            else:
-                print(f"Failed to send activity to {instance.get('domain')}: {response.status_code}")
+        response = await get_federation_client().post(
+            (instance.get("inbox_url") or f"https://{instance.get('domain')}/inbox"),
+            content=_dumps_activity(activity),
+            headers={"Content-Type": "application/activity+json"},
+            timeout=_DELIVERY_TIMEOUT,
+        )
+        
+        if response.status_code in [200, 202]:
+            logger.debug("Successfully sent activity to %s", instance.get('domain'))
+        else:
+            logger.warning("Failed to send activity to %s: %s", instance.get('domain'), response.status_code)
                 
     except Exception as e:
-        print(f"Error sending activity to {instance.get('domain')}: {e}")
+        logger.warning("Error sending activity to %s: %s", instance.get('domain'), e)
 
 async def get_followers_for_activity(activity: Dict[str, Any], db=None) -> List[Dict[str, Any]]:
     """Get followers list for activity（改為透過 GraphQL）"""
@@ -67,8 +117,7 @@ async def get_followers_for_activity(activity: Dict[str, Any], db=None) -> List[
     username = extract_username_from_actor_id(actor_id)
     
     # 改為透過 GraphQL 取得 Actor 與追蹤者
-    from app.core.graphql_client import GraphQLClient
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     actor = await gql.get_actor_by_username(username)
     
     if not actor:
@@ -81,76 +130,84 @@ async def get_followers_for_activity(activity: Dict[str, Any], db=None) -> List[
 async def send_activity_to_inbox(activity: Dict[str, Any], follower: Dict[str, Any]):
     """發送活動到追蹤者的收件匣（保留向後相容性）"""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                follower.get("inbox_url", ""),
-                json=activity,
-                headers={
-                    "Content-Type": "application/activity+json",
-                    "User-Agent": f"READr-Mesh-ActivityPub/1.0"
-                }
-            )
-            
-            if response.status_code in [200, 202]:
-                print(f"Successfully sent activity to {follower.get('inbox_url', '')}")
-            else:
-                print(f"Failed to send activity to {follower.get('inbox_url', '')}: {response.status_code}")
+        response = await get_federation_client().post(
+            follower.get("inbox_url", ""),
+            content=_dumps_activity(activity),
+            headers={"Content-Type": "application/activity+json"},
+            timeout=_DELIVERY_TIMEOUT,
+        )
+        
+        if response.status_code in [200, 202]:
+            logger.debug("Successfully sent activity to %s", follower.get('inbox_url', ''))
+        else:
+            logger.warning("Failed to send activity to %s: %s", follower.get('inbox_url', ''), response.status_code)
                 
     except Exception as e:
-        print(f"Error sending activity to {follower.get('inbox_url', '')}: {e}")
+        logger.warning("Error sending activity to %s: %s", follower.get('inbox_url', ''), e)
 
-def extract_username_from_actor_id(actor_id: str) -> str:
-    """從 Actor ID 中提取使用者名稱"""
-    if not actor_id:
-        return ""
-    
-    # 格式: https://domain.com/users/username
-    parts = actor_id.split("/")
-    return parts[-1] if parts else ""
-
-def is_public_activity(activity: Dict[str, Any]) -> bool:
-    """檢查活動是否為公開"""
-    to = activity.get("to", [])
-    cc = activity.get("cc", [])
-    
-    public_uris = [
-        "https://www.w3.org/ns/activitystreams#Public",
-        "as:Public",
-        "Public"
-    ]
-    
-    # 檢查 to 欄位
-    for uri in public_uris:
-        if uri in to:
-            return True
-    
-    # 檢查 cc 欄位
-    for uri in public_uris:
-        if uri in cc:
-            return True
+def _actor_cache_ttl(response: httpx.Response) -> int:
+    """依遠端 Cache-Control 決定快取秒數，未提供時使用 ACTOR_CACHE_TTL"""
+    cache_control = response.headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else settings.ACTOR_CACHE_TTL
+
+def _cached_actor(actor_id: str) -> Optional[Dict[str, Any]]:
+    cached = _actor_cache.get(actor_id)
+    if cached is None:
+        return None
+    if cached[0] <= time.monotonic():
+        del _actor_cache[actor_id]
+        return None
+    _actor_cache.move_to_end(actor_id)
+    return cached[1]
+
+def _cache_actor(actor_id: str, actor: Dict[str, Any], ttl: int) -> None:
+    _actor_cache[actor_id] = (time.monotonic() + ttl, actor)
+    _actor_cache.move_to_end(actor_id)
+    while len(_actor_cache) > settings.ACTOR_CACHE_MAX_ENTRIES:
+        _actor_cache.popitem(last=False)
+
+async def discover_actor(actor_id: str, client: Optional[httpx.AsyncClient] = None) -> Optional[Dict[str, Any]]:
+    """發現遠端 Actor（結果依 TTL 快取）"""
+    cached = _cached_actor(actor_id)
+    if cached is not None:
+        return cached
     
-    return False
+    lock = _actor_locks.setdefault(actor_id, asyncio.Lock())
+    async with lock:
+        # 等待鎖期間可能已由其他請求取得
+        cached = _cached_actor(actor_id)
+        if cached is not None:
+            return cached
+        try:
+            return await _fetch_actor(actor_id, client or get_federation_client())
+        finally:
+            _actor_locks.pop(actor_id, None)
 
-async def discover_actor(actor_id: str) -> Optional[Dict[str, Any]]:
-    """發現遠端 Actor"""
+async def _fetch_actor(actor_id: str, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                actor_id,
-                headers={
-                    "Accept": "application/activity+json",
-                    "User-Agent": f"READr-Mesh-ActivityPub/1.0"
-                }
-            )
+        response = await client.get(
+            actor_id,
+            headers={
+                "Accept": "application/activity+json",
+                "User-Agent": f"READr-Mesh-ActivityPub/1.0"
+            }
+        )
+        
+        if response.status_code == 200:
+            actor = orjson.loads(response.content)
+            ttl = _actor_cache_ttl(response)
+            if ttl > 0:
+                _cache_actor(actor_id, actor, ttl)
+            return actor
+        else:
+            logger.warning("Failed to discover actor %s: %s", actor_id, response.status_code)
+            return None
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"Failed to discover actor {actor_id}: {response.status_code}")
-                return None
-                
     except Exception as e:
-        print(f"Error discovering actor {actor_id}: {e}")
+        logger.warning("Error discovering actor %s: %s", actor_id, e)
         return None
 
 async def verify_actor_signature(signature: str, actor_id: str, data: str) -> bool:
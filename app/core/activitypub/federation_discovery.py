@@ -2,22 +2,26 @@
 聯邦網站發現和管理模組
 """
 
+import logging
 import httpx
+import orjson
 import asyncio
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 import re
 from urllib.parse import urlparse
 
-from app.core.graphql_client import GraphQLClient
-from app.core.config import settings
+from app.core.graphql_client import get_graphql_client
+from app.core.config import AP_DOMAIN
+
+logger = logging.getLogger(__name__)
 
 class FederationDiscovery:
     """聯邦網站發現器"""
     
     def __init__(self, db: Optional[Any]):
         self.db = db
-        self.gql = GraphQLClient()
+        self.gql = get_graphql_client()
         self.client = httpx.AsyncClient(timeout=30.0)
     
     async def discover_instance(self, domain: str) -> Optional[Dict[str, Any]]:
@@ -41,7 +45,7 @@ class FederationDiscovery:
             return None
             
         except Exception as e:
-            print(f"Error discovering instance {domain}: {e}")
+            logger.warning("Error discovering instance %s: %s", domain, e)
             return None
     
     async def _get_nodeinfo(self, domain: str) -> Optional[Dict[str, Any]]:
@@ -53,7 +57,7 @@ class FederationDiscovery:
                 headers={"Accept": "application/json"}
             )
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             
             # 嘗試 NodeInfo 1.0
             response = await self.client.get(
@@ -61,12 +65,12 @@ class FederationDiscovery:
                 headers={"Accept": "application/json"}
             )
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             
             return None
             
         except Exception as e:
-            print(f"Error getting NodeInfo for {domain}: {e}")
+            logger.warning("Error getting NodeInfo for %s: %s", domain, e)
             return None
     
     async def _get_webfinger(self, domain: str) -> Optional[Dict[str, Any]]:
@@ -79,12 +83,12 @@ class FederationDiscovery:
                 headers={"Accept": "application/json"}
             )
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             
             return None
             
         except Exception as e:
-            print(f"Error getting WebFinger for {domain}: {e}")
+            logger.warning("Error getting WebFinger for %s: %s", domain, e)
             return None
     
     async def _get_activitypub_info(self, domain: str) -> Optional[Dict[str, Any]]:
@@ -96,12 +100,12 @@ class FederationDiscovery:
                 headers={"Accept": "application/activity+json"}
             )
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             
             return None
             
         except Exception as e:
-            print(f"Error getting ActivityPub info for {domain}: {e}")
+            logger.warning("Error getting ActivityPub info for %s: %s", domain, e)
             return None
     
     async def _process_nodeinfo(self, domain: str, nodeinfo: Dict[str, Any]) -> Dict[str, Any]:
@@ -195,7 +199,7 @@ class FederationDiscovery:
                 return False
                 
         except Exception as e:
-            print(f"Error testing connection to {instance.get('domain')}: {e}")
+            logger.warning("Error testing connection to %s: %s", instance.get('domain'), e)
             await self.gql.update_federation_instance(instance.get("id"), {"error_count": (instance.get('error_count', 0) + 1)})
             return False
     
@@ -206,19 +210,19 @@ class FederationDiscovery:
         # 從活動的 actor 欄位發現
         if "actor" in activity:
             actor_domain = self._extract_domain_from_actor(activity["actor"])
-            if actor_domain and actor_domain != settings.ACTIVITYPUB_DOMAIN:
+            if actor_domain and actor_domain != AP_DOMAIN:
                 discovered_domains.append(actor_domain)
         
         # 從活動的 object 欄位發現
         if "object" in activity:
             object_domain = self._extract_domain_from_object(activity["object"])
-            if object_domain and object_domain != settings.ACTIVITYPUB_DOMAIN:
+            if object_domain and object_domain != AP_DOMAIN:
                 discovered_domains.append(object_domain)
         
         # 從活動的 target 欄位發現
         if "target" in activity:
             target_domain = self._extract_domain_from_object(activity["target"])
-            if target_domain and target_domain != settings.ACTIVITYPUB_DOMAIN:
+            if target_domain and target_domain != AP_DOMAIN:
                 discovered_domains.append(target_domain)
         
         return list(set(discovered_domains))
@@ -273,7 +277,7 @@ class FederationDiscovery:
 class FederationManager:
     """聯邦管理器"""
     
-    def __init__(self, db: Optional[AsyncSession]):
+    def __init__(self, db: Optional[Any]):
         self.db = db
         self.discovery = FederationDiscovery(db)
     
@@ -294,7 +298,7 @@ class FederationManager:
                     discovered_domains.extend(new_domains)
                     
             except Exception as e:
-                print(f"Error discovering from instance {(instance['domain'] if isinstance(instance, dict) else instance.domain)}: {e}")
+                logger.warning("Error discovering from instance %s: %s", (instance['domain'] if isinstance(instance, dict) else instance.domain), e)
         
         # 去重並發現新實例
         unique_domains = list(set(discovered_domains))
@@ -322,12 +326,12 @@ class FederationManager:
             )
             
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             else:
                 return []
                 
         except Exception as e:
-            print(f"Error getting public timeline from {(instance['domain'] if isinstance(instance, dict) else instance.domain)}: {e}")
+            logger.warning("Error getting public timeline from %s: %s", (instance['domain'] if isinstance(instance, dict) else instance.domain), e)
             return []
     
     async def approve_instance(self, domain: str) -> bool:
@@ -4,134 +4,258 @@ Handles syncing ActivityPub activities to Mesh system via GraphQL
 """
 
 import asyncio
-from typing import Dict, Any, Optional, List
+import functools
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, Hashable
 from datetime import datetime
+from types import SimpleNamespace
+from urllib.parse import urlsplit
 
-from app.core.graphql_client import GraphQLClient
+from app.core.graphql_client import get_graphql_client, MutationBatcher
 from typing import Any
 from app.core.activitypub.mesh_utils import parse_mesh_pick_from_activity, parse_mesh_comment_from_activity
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# 缺少陣列欄位時使用的共用空序列，避免每次建立空 list
+_EMPTY: tuple = ()
+
+# 內容分類與擷取用的正規表示式於載入時編譯一次；URL 以 ASCII 可列印字元 [!-~] 比對，
+# 避免 \S 在中文內容上走 Unicode 分類查表
+_URL_RE = re.compile(r'https?://[!-~]+')
+_url_search = _URL_RE.search
+# 「分享這篇文章」「推薦閱讀」已被「分享」「推薦」涵蓋
+_PICK_HINT_RE = re.compile(r'https?://[!-~]+|www\.[!-~]+|readr\.tw|分享|推薦', re.IGNORECASE)
+_SHARE_TITLE_RE = re.compile(r'分享[：:]\s*(.+)')
+_SHARE_TAG_NAMES = frozenset({"分享", "推薦", "文章"})
+
+# 近期已同步的 activity id 保留時間（秒）與上限，用於擋下上游重複投遞
+_RECENT_TTL = 300.0
+_RECENT_MAX = 4096
+
+@functools.lru_cache(maxsize=4096)
+def _parse_actor_id(actor_id: str) -> Optional[Tuple[str, str]]:
+    """將 Actor URL 解析為 (domain, username)；同一 actor 重複出現時直接命中快取"""
+    parsed = urlsplit(actor_id)
+    if not parsed.netloc:
+        return None
+    parts = parsed.path.rstrip("/").rsplit("/", 1)
+    if len(parts) != 2 or not parts[1]:
+        return None
+    return parsed.netloc, parts[1]
+
+class _SyncBatch:
+    """一次批次同步共用的預先查詢結果
+
+    actors / stories 為批次開始時以 `in` 查詢取得的記錄；批次內缺少的記錄
+    透過 once() 保證同一 key 只建立一次，避免並行的 activity 重複建立。
+    """
+
+    def __init__(self, actors: Dict[str, Dict[str, Any]], stories: Dict[str, Dict[str, Any]]):
+        self.actors = actors
+        self.stories = stories
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+    async def once(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.ensure_future(factory())
+        return await task
+
+# 由 sync_activities_batch 設定；asyncio.gather 產生的子任務會複製此 context
+_current_batch: ContextVar[Optional[_SyncBatch]] = ContextVar("mesh_sync_batch", default=None)
+
+def _mesh_ids(record: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str]]:
+    """自 Activity 記錄的 object_data 取出同步時記下的 (mesh_pick_id, mesh_comment_id)"""
+    object_data = (record or {}).get("object_data") or {}
+    return object_data.get("mesh_pick_id"), object_data.get("mesh_comment_id")
+
+def _story_url_of(object_data: Dict[str, Any]) -> Optional[str]:
+    """取得 Note 可能對應的 Story URL（attachment Link 優先，其次為內容中的第一個 URL）"""
+    href = next((a["href"] for a in (object_data.get("attachment") or _EMPTY) if a.get("type") == "Link" and a.get("href")), None)
+    if href:
+        return href
+    match = _url_search(object_data.get("content") or "")
+    return match.group(0) if match else None
+
 class MeshSyncManager:
     """Mesh synchronization manager for ActivityPub activities"""
     
     def __init__(self):
-        self.graphql_client = GraphQLClient()
+        self.graphql_client = get_graphql_client()
+        # 同一批次窗口內的 createPick / createComment 合併為單一 GraphQL 請求
+        self._pick_batcher = MutationBatcher(self.graphql_client.create_picks_bulk)
+        self._comment_batcher = MutationBatcher(self.graphql_client.create_comments_bulk)
+        # 同步成功後的 Activity 記錄（含 mesh id 對應）同樣合併寫入
+        self._activity_batcher = MutationBatcher(self.graphql_client.create_activities_bulk)
+        # Like / Follow 寫入不影響同步結果，排入批次後即返回
+        self._like_batcher = MutationBatcher(self.graphql_client.like_comments_bulk)
+        self._follow_batcher = MutationBatcher(self.graphql_client.follow_members_bulk)
+        # activity id -> (到期時間, 同步 task)；重複投遞直接共用同一次同步結果
+        self._recent: Dict[str, Tuple[float, asyncio.Future]] = {}
+    
+    async def sync_activities_batch(self, activities: List[Dict[str, Any]], db=None) -> List[bool]:
+        """Sync multiple ActivityPub activities concurrently; Pick/Comment creation is batched
+
+        批次內所有 Actor 與 Story 先各以一次 `in` 查詢取得，避免逐筆 N+1 查詢。
+        """
+        usernames = set()
+        urls = set()
+        for activity in activities:
+            actor_refs = [activity.get("actor")]
+            if activity.get("type") == "Follow":
+                actor_refs.append(activity.get("object"))
+            for ref in actor_refs:
+                parsed = _parse_actor_id(ref) if isinstance(ref, str) and ref else None
+                if parsed:
+                    usernames.add(parsed[1])
+            object_data = activity.get("object")
+            if activity.get("type") == "Create" and isinstance(object_data, dict):
+                url = _story_url_of(object_data)
+                if url:
+                    urls.add(url)
+        
+        actors, stories = await asyncio.gather(
+            self.graphql_client.get_actors_by_usernames(sorted(usernames)),
+            self.graphql_client.get_stories_by_urls(sorted(urls)),
+        )
+        token = _current_batch.set(_SyncBatch(actors, stories))
+        try:
+            results = await self.graphql_client.map(
+                lambda activity: self.sync_activity_to_mesh(activity, db),
+                activities,
+                return_exceptions=True,
+            )
+        finally:
+            _current_batch.reset(token)
+        return [result is True for result in results]
     
     async def sync_activity_to_mesh(self, activity_data: Dict[str, Any], db=None) -> bool:
-        """Sync ActivityPub activity to Mesh system"""
-        activity_type = activity_data.get("type")
+        """Sync ActivityPub activity to Mesh system
+
+        同一 activity id 在 _RECENT_TTL 內重複送達時不會再次寫入 Mesh。
+        """
+        activity_id = activity_data.get("id")
+        if not activity_id:
+            return await self._dispatch(activity_data, db)
         
-        if activity_type == "Create":
-            return await self._sync_create_activity(activity_data, db)
-        elif activity_type == "Like":
-            return await self._sync_like_activity(activity_data, db)
-        elif activity_type == "Announce":
-            return await self._sync_announce_activity(activity_data, db)
-        elif activity_type == "Follow":
-            return await self._sync_follow_activity(activity_data, db)
+        now = time.monotonic()
+        entry = self._recent.get(activity_id)
+        if entry and entry[0] > now:
+            task = entry[1]
+            return task.result() if task.done() else await asyncio.shield(task)
         
-        return False
+        if len(self._recent) >= _RECENT_MAX:
+            self._prune_recent(now)
+        task = asyncio.ensure_future(self._dispatch(activity_data, db))
+        self._recent[activity_id] = (now + _RECENT_TTL, task)
+        try:
+            synced = await task
+        except BaseException:
+            self._recent.pop(activity_id, None)
+            raise
+        if not synced:
+            # 失敗的同步不保留，允許重新投遞時再試
+            self._recent.pop(activity_id, None)
+        return synced
+    
+    def _prune_recent(self, now: float) -> None:
+        for key in [k for k, (expires, _) in self._recent.items() if expires <= now]:
+            del self._recent[key]
+        # 仍超過上限時丟棄最早加入的項目
+        while len(self._recent) >= _RECENT_MAX:
+            del self._recent[next(iter(self._recent))]
+    
+    async def _dispatch(self, activity_data: Dict[str, Any], db=None) -> bool:
+        handler = self._DISPATCH.get(activity_data.get("type"))
+        return await handler(self, activity_data, db) if handler else False
     
     async def _sync_create_activity(self, activity_data: Dict[str, Any], db=None) -> bool:
         """Sync Create activity to Mesh"""
         object_data = activity_data.get("object", {})
-        object_type = object_data.get("type")
-        
-        if object_type == "Note":
-            # Check if it's a Mesh Pick or Comment
-            if await self._is_mesh_pick(object_data):
-                return await self._sync_pick_to_mesh(activity_data, db)
-            elif await self._is_mesh_comment(object_data):
-                return await self._sync_comment_to_mesh(activity_data, db)
-            else:
-                # Handle standard ActivityPub Note
-                return await self._sync_standard_note_to_mesh(activity_data, db)
-        elif object_type == "Article":
-            return await self._sync_article_to_mesh(activity_data, db)
+        handler = self._CREATE_DISPATCH.get(object_data.get("type"))
+        return await handler(self, activity_data, db) if handler else False
+    
+    async def _sync_note_activity(self, activity_data: Dict[str, Any], db=None) -> bool:
+        """Sync Create(Note) activity to Mesh"""
+        object_data = activity_data.get("object", {})
         
-        return False
+        # Check if it's a Mesh Pick or Comment
+        if self._is_mesh_pick(object_data):
+            return await self._sync_pick_to_mesh(activity_data, db)
+        elif self._is_mesh_comment(object_data):
+            return await self._sync_comment_to_mesh(activity_data, db)
+        else:
+            # Handle standard ActivityPub Note
+            return await self._sync_standard_note_to_mesh(activity_data, db)
     
     async def _sync_standard_note_to_mesh(self, activity_data: Dict[str, Any], db=None) -> bool:
         """Sync standard ActivityPub Note to Mesh (Pick + Comment)"""
         try:
-            object_data = activity_data.get("object", {})
+            object_data = activity_data.get("object") or {}
+            object_id = object_data.get("id")
             
-            # Get or create Actor
+            # Get or create Actor；同時以 GraphQL Activity 記錄檢查是否重複（兩者互不相依，並行送出）
             actor_id = activity_data.get("actor")
-            actor = await self._get_or_create_actor(actor_id, db)
+            actor, existing_activity = await asyncio.gather(
+                self._get_or_create_actor(actor_id, db),
+                self.graphql_client.get_activity_by_activity_id(object_id),
+            )
             
             if not actor:
-                print(f"Failed to get/create actor: {actor_id}")
+                logger.warning("Failed to get/create actor: %s", actor_id)
                 return False
             
-            # 使用 GraphQL Activity 記錄避免重複
-            existing_activity = await self.graphql_client.get_activity_by_activity_id(activity_data.get("object", {}).get("id"))
             if existing_activity:
                 return True
             
             # Determine if this Note should become a Pick or Comment
-            if await self._should_become_pick(object_data):
-                return await self._convert_note_to_pick(activity_data, db)
+            if self._should_become_pick(object_data):
+                return await self._convert_note_to_pick(activity_data, db, actor=actor)
             else:
-                return await self._convert_note_to_comment(activity_data, db)
+                return await self._convert_note_to_comment(activity_data, db, actor=actor)
                 
-        except Exception as e:
-            print(f"Error syncing standard Note to Mesh: {e}")
+        except Exception:
+            logger.exception("Error syncing standard Note to Mesh")
             return False
     
-    async def _should_become_pick(self, object_data: Dict[str, Any]) -> bool:
+    def _should_become_pick(self, object_data: Dict[str, Any]) -> bool:
         """Determine if ActivityPub Note should become a Mesh Pick"""
         content = object_data.get("content", "")
         
         # Check for URL patterns in content
-        import re
-        url_patterns = [
-            r'https?://[^\s]+',
-            r'www\.[^\s]+',
-            r'readr\.tw',
-            r'分享',
-            r'推薦',
-            r'分享這篇文章',
-            r'推薦閱讀'
-        ]
-        
-        for pattern in url_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                return True
+        if _PICK_HINT_RE.search(content):
+            return True
         
         # Check for attachments with URLs
-        attachments = object_data.get("attachment", [])
-        for attachment in attachments:
-            if attachment.get("type") == "Link" and attachment.get("href"):
-                return True
+        if self._is_mesh_pick(object_data):
+            return True
         
         # Check for tags that indicate sharing
-        tags = object_data.get("tag", [])
-        for tag in tags:
-            if isinstance(tag, dict) and tag.get("name") in ["分享", "推薦", "文章"]:
-                return True
-        
-        return False
+        return any(isinstance(tag, dict) and tag.get("name") in _SHARE_TAG_NAMES for tag in (object_data.get("tag") or _EMPTY))
     
-    async def _convert_note_to_pick(self, activity_data: Dict[str, Any], db=None) -> bool:
+    async def _convert_note_to_pick(self, activity_data: Dict[str, Any], db=None, actor: Optional[Any] = None) -> bool:
         """Convert ActivityPub Note to Mesh Pick"""
         try:
-            object_data = activity_data.get("object", {})
+            object_data = activity_data.get("object") or {}
+            object_id = object_data.get("id")
             content = object_data.get("content", "")
             
             # Extract URL from content
-            import re
-            url_match = re.search(r'https?://[^\s]+', content)
+            url_match = _url_search(content)
             url = url_match.group(0) if url_match else None
             
             # Extract title from content or use default
-            title_match = re.search(r'分享[：:]\s*(.+)', content)
+            title_match = _SHARE_TITLE_RE.search(content)
             title = title_match.group(1) if title_match else "分享的文章"
             
-            # Get or create Actor
-            actor_id = activity_data.get("actor")
-            actor = await self._get_or_create_actor(actor_id, db)
+            # Get or create Actor（由 _sync_standard_note_to_mesh 呼叫時已解析，直接沿用）
+            if actor is None:
+                actor = await self._get_or_create_actor(activity_data.get("actor"), db)
             
             if not actor:
                 return False
@@ -156,34 +280,35 @@ class MeshSyncManager:
             }
             
             # Create Pick in Mesh
-            result = await self.graphql_client.create_pick(pick_input)
+            result = await self._pick_batcher.submit(pick_input)
             
             if result:
                 # 紀錄 Activity 以避免重複處理
-                await self.graphql_client.create_activity({
-                    "activity_id": activity_data.get("object", {}).get("id"),
+                await self._activity_batcher.enqueue({
+                    "activity_id": object_id,
                     "activity_type": "Create",
                     "actor": {"connect": {"id": actor.graphql_id}},
-                    "object_data": activity_data.get("object", {}),
+                    "object_data": {**object_data, "mesh_pick_id": result.get("id")},
                 })
-                print(f"Successfully converted Note to Pick: {result.get('id')}")
+                logger.info("Successfully converted Note to Pick: %s", result.get("id"))
                 return True
             
             return False
             
-        except Exception as e:
-            print(f"Error converting Note to Pick: {e}")
+        except Exception:
+            logger.exception("Error converting Note to Pick")
             return False
     
-    async def _convert_note_to_comment(self, activity_data: Dict[str, Any], db=None) -> bool:
+    async def _convert_note_to_comment(self, activity_data: Dict[str, Any], db=None, actor: Optional[Any] = None) -> bool:
         """Convert ActivityPub Note to Mesh Comment"""
         try:
-            object_data = activity_data.get("object", {})
+            object_data = activity_data.get("object") or {}
+            object_id = object_data.get("id")
             content = object_data.get("content", "")
             
-            # Get or create Actor
-            actor_id = activity_data.get("actor")
-            actor = await self._get_or_create_actor(actor_id, db)
+            # Get or create Actor（由 _sync_standard_note_to_mesh 呼叫時已解析，直接沿用）
+            if actor is None:
+                actor = await self._get_or_create_actor(activity_data.get("actor"), db)
             
             if not actor:
                 return False
@@ -195,8 +320,7 @@ class MeshSyncManager:
             if in_reply_to:
                 # Try to find the Pick this comment is replying to
                 pick = await self._find_pick_by_activity_id(in_reply_to, db)
-                if pick and pick.mesh_pick_id:
-                    pick_id = pick.mesh_pick_id
+                pick_id = _mesh_ids(pick)[0]
             
             # Prepare Comment data
             comment_input = {
@@ -208,47 +332,57 @@ class MeshSyncManager:
                 comment_input["pickId"] = pick_id
             
             # Create Comment in Mesh
-            result = await self.graphql_client.create_comment(comment_input)
+            result = await self._comment_batcher.submit(comment_input)
             
             if result:
                 # 紀錄 Activity 以避免重複處理
-                await self.graphql_client.create_activity({
-                    "activity_id": activity_data.get("object", {}).get("id"),
+                await self._activity_batcher.enqueue({
+                    "activity_id": object_id,
                     "activity_type": "Create",
                     "actor": {"connect": {"id": actor.graphql_id}},
-                    "object_data": activity_data.get("object", {}),
+                    "object_data": {**object_data, "mesh_comment_id": result.get("id")},
                 })
-                print(f"Successfully converted Note to Comment: {result.get('id')}")
+                logger.info("Successfully converted Note to Comment: %s", result.get("id"))
                 return True
             
             return False
             
-        except Exception as e:
-            print(f"Error converting Note to Comment: {e}")
+        except Exception:
+            logger.exception("Error converting Note to Comment")
             return False
     
     async def _sync_pick_to_mesh(self, activity_data: Dict[str, Any], db=None) -> bool:
         """Sync Pick activity to Mesh system"""
         try:
+            object_data = activity_data.get("object") or {}
+            object_id = object_data.get("id")
+            
             # Parse Pick data from ActivityPub
             pick_info = parse_mesh_pick_from_activity(activity_data)
             
-            # Get or create Actor
+            # Get or create Actor；同時檢查是否重複並查找 Story（三者互不相依，並行送出）
             actor_id = activity_data.get("actor")
-            actor = await self._get_or_create_actor(actor_id, db)
+            story_info = pick_info["story"]
+            actor, existing_activity, story_id = await asyncio.gather(
+                self._get_or_create_actor(actor_id, db),
+                self.graphql_client.get_activity_by_activity_id(object_id),
+                self._find_story_id(story_info),
+            )
             
             if not actor:
-                print(f"Failed to get/create actor: {actor_id}")
+                logger.warning("Failed to get/create actor: %s", actor_id)
                 return False
             
-            # 使用 GraphQL Activity 記錄避免重複
-            existing_activity = await self.graphql_client.get_activity_by_activity_id(activity_data.get("object", {}).get("id"))
             if existing_activity:
                 return True
             
+            # Story 不存在時才建立（須在確認非重複之後）
+            if not story_id and story_info.get("url"):
+                story_id = await self._create_story_once(story_info)
+            
             # Prepare Pick data for Mesh
             pick_input = {
-                "storyId": await self._get_or_create_story_id(pick_info["story"]),
+                "storyId": story_id or "",
                 "objective": pick_info["pick"]["objective"],
                 "kind": pick_info["pick"]["kind"],
                 "paywall": False,
@@ -256,42 +390,46 @@ class MeshSyncManager:
             }
             
             # Create Pick in Mesh via GraphQL
-            result = await self.graphql_client.create_pick(pick_input)
+            result = await self._pick_batcher.submit(pick_input)
             
             if result:
                 # 紀錄 Activity 以避免重複處理
-                await self.graphql_client.create_activity({
-                    "activity_id": activity_data.get("object", {}).get("id"),
+                await self._activity_batcher.enqueue({
+                    "activity_id": object_id,
                     "activity_type": "Create",
                     "actor": {"connect": {"id": actor.graphql_id}},
-                    "object_data": activity_data.get("object", {}),
+                    "object_data": {**object_data, "mesh_pick_id": result.get("id")},
                 })
-                print(f"Successfully synced Pick to Mesh: {result.get('id')}")
+                logger.info("Successfully synced Pick to Mesh: %s", result.get("id"))
                 return True
             else:
-                print("Failed to create Pick in Mesh system")
+                logger.warning("Failed to create Pick in Mesh system")
                 return False
                 
-        except Exception as e:
-            print(f"Error syncing Pick to Mesh: {e}")
+        except Exception:
+            logger.exception("Error syncing Pick to Mesh")
             return False
     
     async def _sync_comment_to_mesh(self, activity_data: Dict[str, Any], db=None) -> bool:
         """Sync Comment activity to Mesh system"""
         try:
+            object_data = activity_data.get("object") or {}
+            object_id = object_data.get("id")
+            
             # Parse Comment data from ActivityPub
             comment_info = parse_mesh_comment_from_activity(activity_data)
             
-            # Get or create Actor
+            # Get or create Actor；同時以 GraphQL Activity 記錄檢查是否重複（兩者互不相依，並行送出）
             actor_id = activity_data.get("actor")
-            actor = await self._get_or_create_actor(actor_id, db)
+            actor, existing_activity = await asyncio.gather(
+                self._get_or_create_actor(actor_id, db),
+                self.graphql_client.get_activity_by_activity_id(object_id),
+            )
             
             if not actor:
-                print(f"Failed to get/create actor: {actor_id}")
+                logger.warning("Failed to get/create actor: %s", actor_id)
                 return False
             
-            # 使用 GraphQL Activity 記錄避免重複
-            existing_activity = await self.graphql_client.get_activity_by_activity_id(activity_data.get("object", {}).get("id"))
             if existing_activity:
                 return True
             
@@ -301,37 +439,38 @@ class MeshSyncManager:
                 "memberId": actor.mesh_member_id
             }
             
+            # Pick 與 Comment 共用同一份 Activity 記錄，inReplyTo 只需查詢一次
+            in_reply_to = comment_info["in_reply_to"]
+            reply_target = await self._get_comment_by_activity_id(in_reply_to, db) if in_reply_to else None
+            mesh_pick_id, mesh_comment_id = _mesh_ids(reply_target)
+            
             # Add parent comment if exists
-            if comment_info["in_reply_to"]:
-                parent_comment = await self._get_comment_by_activity_id(comment_info["in_reply_to"], db)
-                if parent_comment and parent_comment.mesh_comment_id:
-                    comment_input["parentId"] = parent_comment.mesh_comment_id
+            if mesh_comment_id:
+                comment_input["parentId"] = mesh_comment_id
             
             # Add pick reference if exists
-            if comment_info["in_reply_to"] and "picks" in comment_info["in_reply_to"]:
-                pick = await self._get_pick_by_activity_id(comment_info["in_reply_to"], db)
-                if pick and pick.mesh_pick_id:
-                    comment_input["pickId"] = pick.mesh_pick_id
+            if "/picks/" in (in_reply_to or "") and mesh_pick_id:
+                comment_input["pickId"] = mesh_pick_id
             
             # Create Comment in Mesh via GraphQL
-            result = await self.graphql_client.create_comment(comment_input)
+            result = await self._comment_batcher.submit(comment_input)
             
             if result:
                 # 紀錄 Activity 以避免重複處理
-                await self.graphql_client.create_activity({
-                    "activity_id": activity_data.get("object", {}).get("id"),
+                await self._activity_batcher.enqueue({
+                    "activity_id": object_id,
                     "activity_type": "Create",
                     "actor": {"connect": {"id": actor.graphql_id}},
-                    "object_data": activity_data.get("object", {}),
+                    "object_data": {**object_data, "mesh_comment_id": result.get("id")},
                 })
-                print(f"Successfully synced Comment to Mesh: {result.get('id')}")
+                logger.info("Successfully synced Comment to Mesh: %s", result.get("id"))
                 return True
             else:
-                print("Failed to create Comment in Mesh system")
+                logger.warning("Failed to create Comment in Mesh system")
                 return False
                 
-        except Exception as e:
-            print(f"Error syncing Comment to Mesh: {e}")
+        except Exception:
+            logger.exception("Error syncing Comment to Mesh")
             return False
     
     async def _sync_like_activity(self, activity_data: Dict[str, Any], db=None) -> bool:
@@ -347,23 +486,28 @@ class MeshSyncManager:
             # Get liked object
             object_id = activity_data.get("object")
             
+            # Pick 與 Comment 共用同一份 Activity 記錄，只查詢一次
+            target = await self._get_pick_by_activity_id(object_id, db)
+            
+            mesh_pick_id, mesh_comment_id = _mesh_ids(target)
+            
             # Check if it's a Pick like（Keystone 目前不支援 Pick like 關聯，僅送出 AP Like）
-            pick = await self._get_pick_by_activity_id(object_id, db)
-            if pick and pick.mesh_pick_id:
+            if mesh_pick_id:
                 return True
             
-            # Check if it's a Comment like
-            comment = await self._get_comment_by_activity_id(object_id, db)
-            if comment and comment.mesh_comment_id:
-                result = await self.graphql_client.like_comment(comment.mesh_comment_id, actor.mesh_member_id)
-                if result:
-                    print(f"Successfully synced Comment like to Mesh: {result.get('id')}")
-                    return True
+            # Check if it's a Comment like（寫入於背景批次送出，失敗由 batcher 記錄）
+            # 沒有對應 Mesh Member 的 Actor（例如遠端 Actor）無法寫入 like
+            if mesh_comment_id and actor.mesh_member_id:
+                await self._like_batcher.enqueue({
+                    "commentId": mesh_comment_id,
+                    "memberId": actor.mesh_member_id,
+                })
+                return True
             
             return False
             
-        except Exception as e:
-            print(f"Error syncing Like activity to Mesh: {e}")
+        except Exception:
+            logger.exception("Error syncing Like activity to Mesh")
             return False
     
     async def _sync_follow_activity(self, activity_data: Dict[str, Any], db=None) -> bool:
@@ -373,88 +517,125 @@ class MeshSyncManager:
             follower_id = activity_data.get("actor")
             following_id = activity_data.get("object")
             
-            follower = await self._get_or_create_actor(follower_id, db)
-            following = await self._get_or_create_actor(following_id, db)
+            follower, following = await asyncio.gather(
+                self._get_or_create_actor(follower_id, db),
+                self._get_or_create_actor(following_id, db),
+            )
             
+            # 兩端都需有對應的 Mesh Member；缺少時不排入，以免 null 變數使整批 mutation 失敗
             if not follower or not following:
                 return False
+            if not follower.mesh_member_id or not following.mesh_member_id:
+                return False
             
-            # Create follow relationship in Mesh
-            result = await self.graphql_client.follow_member(
-                follower.mesh_member_id,
-                following.mesh_member_id
-            )
-            
-            if result:
-                print(f"Successfully synced Follow to Mesh: {result.get('id')}")
-                return True
-            
-            return False
+            # Create follow relationship in Mesh（背景批次送出，失敗由 batcher 記錄）
+            await self._follow_batcher.enqueue({
+                "followerId": follower.mesh_member_id,
+                "followingId": following.mesh_member_id,
+            })
+            return True
             
-        except Exception as e:
-            print(f"Error syncing Follow activity to Mesh: {e}")
+        except Exception:
+            logger.exception("Error syncing Follow activity to Mesh")
             return False
     
-    async def _is_mesh_pick(self, object_data: Dict[str, Any]) -> bool:
+    async def drain(self) -> None:
+        """等待已排入的寫入全部送出（應用關閉時呼叫）"""
+        await asyncio.gather(
+            self._pick_batcher.drain(),
+            self._comment_batcher.drain(),
+            self._activity_batcher.drain(),
+            self._like_batcher.drain(),
+            self._follow_batcher.drain(),
+        )
+    
+    async def record_activity(self, activity_input: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """記錄已處理的 Activity；與同一時間的其他記錄合併為單一 mutation"""
+        return await self._activity_batcher.submit(activity_input)
+    
+    def _is_mesh_pick(self, object_data: Dict[str, Any]) -> bool:
         """Check if object is a Mesh Pick"""
-        attachments = object_data.get("attachment", [])
-        for attachment in attachments:
-            if attachment.get("type") == "Link" and attachment.get("href"):
-                return True
-        return False
+        return any(a.get("type") == "Link" and a.get("href") for a in (object_data.get("attachment") or _EMPTY))
     
-    async def _is_mesh_comment(self, object_data: Dict[str, Any]) -> bool:
+    def _is_mesh_comment(self, object_data: Dict[str, Any]) -> bool:
         """Check if object is a Mesh Comment"""
         in_reply_to = object_data.get("inReplyTo")
-        if in_reply_to and ("picks" in in_reply_to or "comments" in in_reply_to):
+        if in_reply_to and ("/picks/" in in_reply_to or "/comments/" in in_reply_to):
             return True
         return False
     
     async def _get_or_create_actor(self, actor_id: str, db=None) -> Optional[Any]:
         """以 GraphQL 取得或建立 ActivityPubActor，並回傳具備 graphql_id 與 mesh_member_id 的物件"""
-        from types import SimpleNamespace
-        parts = actor_id.split("/")
-        if len(parts) < 2:
+        parsed = _parse_actor_id(actor_id) if actor_id else None
+        if not parsed:
             return None
-        username = parts[-1]
-        gql_actor = await self.graphql_client.get_actor_by_username(username)
-        if not gql_actor:
-            created = await self.graphql_client.create_actor({
-                "username": username,
-                "domain": parts[2],
-                "inbox_url": f"{actor_id}/inbox",
-                "outbox_url": f"{actor_id}/outbox",
-                "is_local": False,
-            })
-            if not created:
-                return None
+        domain, username = parsed
+        batch = _current_batch.get()
+        if batch is not None:
+            gql_actor = batch.actors.get(username)
+            if not gql_actor:
+                gql_actor = await batch.once(("actor", username), lambda: self._create_remote_actor(actor_id, domain, username))
+        else:
             gql_actor = await self.graphql_client.get_actor_by_username(username)
+            if not gql_actor:
+                gql_actor = await self._create_remote_actor(actor_id, domain, username)
+        if not gql_actor:
+            return None
         mesh_member_id = gql_actor.get("mesh_member", {}).get("id") if gql_actor.get("mesh_member") else None
         return SimpleNamespace(graphql_id=gql_actor.get("id"), mesh_member_id=mesh_member_id, username=username)
     
+    async def _create_remote_actor(self, actor_id: str, domain: str, username: str) -> Optional[Dict[str, Any]]:
+        # createActivityPubActor 直接回傳所需欄位，不再重新查詢
+        created = await self.graphql_client.create_actor({
+            "username": username,
+            "domain": domain,
+            "inbox_url": f"{actor_id}/inbox",
+            "outbox_url": f"{actor_id}/outbox",
+            "is_local": False,
+        })
+        if not created:
+            # 並行投遞可能已由其他 worker 建立同一 actor（username 唯一），改取既有記錄
+            created = await self.graphql_client.get_actor_by_username(username)
+        return created
+    
     async def _get_or_create_story_id(self, story_info: Dict[str, Any]) -> str:
         """改為透過 GraphQL 以 URL 查找或建立 Story，回傳其 id"""
         if not story_info.get("url"):
             return ""
-        story = await self.graphql_client.get_story_by_url(story_info["url"])
-        if story:
-            return story.get("id")
+        return await self._find_story_id(story_info) or await self._create_story_once(story_info)
+    
+    async def _find_story_id(self, story_info: Dict[str, Any]) -> Optional[str]:
+        """僅查找既有 Story（不建立），可與其他查詢並行"""
+        if not story_info.get("url"):
+            return None
+        batch = _current_batch.get()
+        if batch is not None:
+            story = batch.stories.get(story_info["url"])
+        else:
+            story = await self.graphql_client.get_story_by_url(story_info["url"])
+        return story.get("id") if story else None
+    
+    async def _create_story_once(self, story_info: Dict[str, Any]) -> str:
+        batch = _current_batch.get()
+        if batch is not None:
+            return await batch.once(("story", story_info["url"]), lambda: self._create_story(story_info))
+        return await self._create_story(story_info)
+    
+    async def _create_story(self, story_info: Dict[str, Any]) -> str:
         created = await self.graphql_client.create_story({
             "title": story_info.get("title") or "",
             "url": story_info["url"],
             "og_image": story_info.get("image_url"),
             "is_active": True,
         })
+        if not created:
+            # 其他 worker 可能已搶先以相同 URL 建立 Story（url 唯一），改取既有記錄
+            created = await self.graphql_client.get_story_by_url(story_info["url"])
         return (created or {}).get("id", "")
     
-    async def _get_existing_pick(self, activity_id: str, db=None):
-        return await self.graphql_client.get_activity_by_activity_id(activity_id)
-    
-    async def _get_existing_comment(self, activity_id: str, db=None):
-        return await self.graphql_client.get_activity_by_activity_id(activity_id)
-    
     async def _get_pick_by_activity_id(self, activity_id: str, db=None):
-        return await self.graphql_client.get_activity_by_activity_id(activity_id)
+        # Mesh id 記錄於 Activity 的 object_data，以 _mesh_ids() 取出
+        return await self.graphql_client.get_activity_target(activity_id)
     
     async def _find_pick_by_activity_id(self, activity_id: str, db=None) -> Optional[Any]:
         """Find Pick by ActivityPub ID (including partial matches)"""
@@ -468,13 +649,17 @@ class MeshSyncManager:
         return None
     
     async def _get_comment_by_activity_id(self, activity_id: str, db=None):
-        return await self.graphql_client.get_activity_by_activity_id(activity_id)
-    
-    async def _update_local_pick_with_mesh_id(self, activity_id: str, mesh_id: str, db=None):
-        return
+        return await self.graphql_client.get_activity_target(activity_id)
     
-    async def _update_local_comment_with_mesh_id(self, activity_id: str, mesh_id: str, db=None):
-        return
+    # 依 activity type / object type 分派；Announce 與 Article 尚未實作同步，回傳 False
+    _DISPATCH = {
+        "Create": _sync_create_activity,
+        "Like": _sync_like_activity,
+        "Follow": _sync_follow_activity,
+    }
+    _CREATE_DISPATCH = {
+        "Note": _sync_note_activity,
+    }
 
 # Global instance
 mesh_sync_manager = MeshSyncManager()
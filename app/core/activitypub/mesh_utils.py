@@ -1,15 +1,24 @@
 from datetime import datetime
 from typing import Dict, Any, Optional, List
-from app.core.config import settings
+from app.core.config import AP_BASE
 from typing import Any
-from app.core.activitypub.utils import generate_activity_id, create_activity_object
+from app.core.activitypub.utils import generate_activity_id, create_activity_object, utc_now_iso
+
+# 模組載入時預先組好的常用字串，避免每次建立物件重複讀取 settings 與拼接
+_BASE = AP_BASE
+_AS_CTX = "https://www.w3.org/ns/activitystreams"
+_PUBLIC_TO = ("https://www.w3.org/ns/activitystreams#Public",)
+_EMPTY: tuple = ()
+
+def _published_ts(primary: Optional[datetime], fallback: Optional[datetime]) -> str:
+    """以 primary（否則 fallback）產生 ActivityPub 的 published 字串"""
+    return (primary or fallback).isoformat() + "Z"
 
 def create_story_object(story: Any) -> Dict[str, Any]:
     """建立 Story 物件（對應 ActivityPub 的 Article）"""
-    story_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/stories/{story.story_id}"
+    story_id = f"{_BASE}/stories/{story.story_id}"
     
     return {
-        "@context": "https://www.w3.org/ns/activitystreams",
         "id": story_id,
         "type": "Article",
         "name": story.title,
@@ -18,27 +27,28 @@ def create_story_object(story: Any) -> Dict[str, Any]:
         "image": story.image_url,
         "published": story.published_date.isoformat() + "Z" if story.published_date else None,
         "updated": story.updated_at.isoformat() + "Z" if story.updated_at else None,
-        "attributedTo": f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/readr",
-        "to": ["https://www.w3.org/ns/activitystreams#Public"],
-        "cc": [f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/readr/followers"]
+        "attributedTo": f"{_BASE}/users/readr",
+        "to": _PUBLIC_TO,
+        "cc": [f"{_BASE}/users/readr/followers"]
     }
 
-def create_pick_object(pick: Any, actor: Any, story: Any) -> Dict[str, Any]:
+def create_pick_object(pick: Any, actor: Any, story: Any, published: Optional[str] = None) -> Dict[str, Any]:
     """建立 Pick 物件（對應 ActivityPub 的 Announce + Note 組合）"""
-    pick_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/picks/{pick.pick_id}"
-    actor_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{actor.username}"
-    story_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/stories/{story.story_id}"
+    if published is None:
+        published = _published_ts(pick.picked_date, pick.created_at)
+    pick_id = f"{_BASE}/picks/{pick.pick_id}"
+    actor_id = f"{_BASE}/users/{actor.username}"
+    story_id = f"{_BASE}/stories/{story.story_id}"
     
     # 建立 Pick 物件（類似 Facebook 的分享）
     pick_object = {
-        "@context": "https://www.w3.org/ns/activitystreams",
         "id": pick_id,
         "type": "Note",
         "attributedTo": actor_id,
         "content": pick.objective or f"分享了這篇文章：{story.title}",
         "contentType": "text/html",
-        "published": pick.picked_date.isoformat() + "Z" if pick.picked_date else pick.created_at.isoformat() + "Z",
-        "to": ["https://www.w3.org/ns/activitystreams#Public"],
+        "published": published,
+        "to": _PUBLIC_TO,
         "cc": [f"{actor_id}/followers"],
         "attachment": [
             {
@@ -60,31 +70,32 @@ def create_pick_object(pick: Any, actor: Any, story: Any) -> Dict[str, Any]:
     
     return pick_object
 
-def create_comment_object(comment: Any, actor: Any, pick: Optional[Any] = None) -> Dict[str, Any]:
+def create_comment_object(comment: Any, actor: Any, pick: Optional[Any] = None, published: Optional[str] = None) -> Dict[str, Any]:
     """建立 Comment 物件"""
-    comment_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/comments/{comment.comment_id}"
-    actor_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{actor.username}"
+    if published is None:
+        published = _published_ts(comment.published_date, comment.created_at)
+    comment_id = f"{_BASE}/comments/{comment.comment_id}"
+    actor_id = f"{_BASE}/users/{actor.username}"
     
     comment_object = {
-        "@context": "https://www.w3.org/ns/activitystreams",
         "id": comment_id,
         "type": "Note",
         "attributedTo": actor_id,
         "content": comment.content,
         "contentType": "text/html",
-        "published": comment.published_date.isoformat() + "Z" if comment.published_date else comment.created_at.isoformat() + "Z",
-        "to": ["https://www.w3.org/ns/activitystreams#Public"],
+        "published": published,
+        "to": _PUBLIC_TO,
         "cc": [f"{actor_id}/followers"]
     }
     
     # 如果是 pick 的評論，添加 inReplyTo
     if pick:
-        pick_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/picks/{pick.pick_id}"
+        pick_id = f"{_BASE}/picks/{pick.pick_id}"
         comment_object["inReplyTo"] = pick_id
     
     # 如果是回覆其他評論
     if comment.parent_id:
-        parent_comment_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/comments/{comment.parent.comment_id}"
+        parent_comment_id = f"{_BASE}/comments/{comment.parent.comment_id}"
         comment_object["inReplyTo"] = parent_comment_id
     
     return comment_object
@@ -92,72 +103,62 @@ def create_comment_object(comment: Any, actor: Any, pick: Optional[Any] = None)
 def create_pick_activity(pick: Any, actor: Any, story: Any) -> Dict[str, Any]:
     """建立 Pick 活動（Create 活動）"""
     activity_id = generate_activity_id("Create", actor.username)
-    actor_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{actor.username}"
+    actor_id = f"{_BASE}/users/{actor.username}"
     
-    pick_object = create_pick_object(pick, actor, story)
+    published = _published_ts(pick.picked_date, pick.created_at)
+    pick_object = create_pick_object(pick, actor, story, published=published)
     
     return {
-        "@context": "https://www.w3.org/ns/activitystreams",
+        "@context": _AS_CTX,
         "id": activity_id,
         "type": "Create",
         "actor": actor_id,
         "object": pick_object,
-        "published": pick.picked_date.isoformat() + "Z" if pick.picked_date else pick.created_at.isoformat() + "Z",
-        "to": ["https://www.w3.org/ns/activitystreams#Public"],
+        "published": published,
+        "to": _PUBLIC_TO,
         "cc": [f"{actor_id}/followers"]
     }
 
 def create_comment_activity(comment: Any, actor: Any, pick: Optional[Any] = None) -> Dict[str, Any]:
     """建立 Comment 活動（Create 活動）"""
     activity_id = generate_activity_id("Create", actor.username)
-    actor_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{actor.username}"
+    actor_id = f"{_BASE}/users/{actor.username}"
     
-    comment_object = create_comment_object(comment, actor, pick)
+    published = _published_ts(comment.published_date, comment.created_at)
+    comment_object = create_comment_object(comment, actor, pick, published=published)
     
     return {
-        "@context": "https://www.w3.org/ns/activitystreams",
+        "@context": _AS_CTX,
         "id": activity_id,
         "type": "Create",
         "actor": actor_id,
         "object": comment_object,
-        "published": comment.published_date.isoformat() + "Z" if comment.published_date else comment.created_at.isoformat() + "Z",
-        "to": ["https://www.w3.org/ns/activitystreams#Public"],
+        "published": published,
+        "to": _PUBLIC_TO,
         "cc": [f"{actor_id}/followers"]
     }
 
+# Like / Announce 只有 id、actor、object、published、cc 會變動，其餘欄位以範本淺拷貝
+_LIKE_TEMPLATE = {"@context": _AS_CTX, "type": "Like", "to": _PUBLIC_TO}
+_ANNOUNCE_TEMPLATE = {"@context": _AS_CTX, "type": "Announce", "to": _PUBLIC_TO}
+
+def _pick_reaction_activity(template: Dict[str, Any], activity_type: str, pick: Any, actor: Any) -> Dict[str, Any]:
+    actor_id = f"{_BASE}/users/{actor.username}"
+    activity = template.copy()
+    activity["id"] = generate_activity_id(activity_type, actor.username)
+    activity["actor"] = actor_id
+    activity["object"] = f"{_BASE}/picks/{pick.pick_id}"
+    activity["published"] = utc_now_iso()
+    activity["cc"] = [f"{actor_id}/followers"]
+    return activity
+
 def create_like_pick_activity(pick: Any, actor: Any) -> Dict[str, Any]:
     """建立對 Pick 的 Like 活動"""
-    activity_id = generate_activity_id("Like", actor.username)
-    actor_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{actor.username}"
-    pick_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/picks/{pick.pick_id}"
-    
-    return {
-        "@context": "https://www.w3.org/ns/activitystreams",
-        "id": activity_id,
-        "type": "Like",
-        "actor": actor_id,
-        "object": pick_id,
-        "published": datetime.utcnow().isoformat() + "Z",
-        "to": ["https://www.w3.org/ns/activitystreams#Public"],
-        "cc": [f"{actor_id}/followers"]
-    }
+    return _pick_reaction_activity(_LIKE_TEMPLATE, "Like", pick, actor)
 
 def create_announce_pick_activity(pick: Any, actor: Any) -> Dict[str, Any]:
     """建立對 Pick 的 Announce 活動（轉發）"""
-    activity_id = generate_activity_id("Announce", actor.username)
-    actor_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{actor.username}"
-    pick_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/picks/{pick.pick_id}"
-    
-    return {
-        "@context": "https://www.w3.org/ns/activitystreams",
-        "id": activity_id,
-        "type": "Announce",
-        "actor": actor_id,
-        "object": pick_id,
-        "published": datetime.utcnow().isoformat() + "Z",
-        "to": ["https://www.w3.org/ns/activitystreams#Public"],
-        "cc": [f"{actor_id}/followers"]
-    }
+    return _pick_reaction_activity(_ANNOUNCE_TEMPLATE, "Announce", pick, actor)
 
 def parse_mesh_pick_from_activity(activity_data: Dict[str, Any]) -> Dict[str, Any]:
     """從 ActivityPub 活動解析 Mesh Pick 資料"""
@@ -171,12 +172,10 @@ def parse_mesh_pick_from_activity(activity_data: Dict[str, Any]) -> Dict[str, An
     }
     
     # 從 attachment 中提取 URL
-    attachments = object_data.get("attachment", [])
-    for attachment in attachments:
-        if attachment.get("type") == "Link":
-            story_info["url"] = attachment.get("href")
-            story_info["image_url"] = attachment.get("image")
-            break
+    link = next((a for a in (object_data.get("attachment") or _EMPTY) if a.get("type") == "Link"), None)
+    if link:
+        story_info["url"] = link.get("href")
+        story_info["image_url"] = link.get("image")
     
     # 提取 pick 資訊
     pick_info = {
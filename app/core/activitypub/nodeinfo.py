@@ -2,9 +2,12 @@ from fastapi import APIRouter
 from fastapi.responses import ORJSONResponse
 from fastapi import Response
 from typing import Dict, Any
-from app.core.config import settings
+import orjson
+from app.core.config import AP_BASE
 
-nodeinfo_router = APIRouter()
+nodeinfo_router = APIRouter(default_response_class=ORJSONResponse)
+
+_CACHE_HEADERS = {"Cache-Control": "public, max-age=3600"}
 
 def get_nodeinfo() -> Dict[str, Any]:
     """取得 NodeInfo 資訊"""
@@ -12,21 +15,14 @@ def get_nodeinfo() -> Dict[str, Any]:
         "links": [
             {
                 "rel": "http://nodeinfo.diaspora.software/ns/schema/2.0",
-                "href": f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/.well-known/nodeinfo/2.0"
+                "href": f"{AP_BASE}/.well-known/nodeinfo/2.0"
             }
         ]
     }
 
-@nodeinfo_router.get("", response_class=ORJSONResponse)
-def nodeinfo_index() -> Response:
-    """/.well-known/nodeinfo discovery endpoint"""
-    data = get_nodeinfo()
-    return ORJSONResponse(data, headers={"Cache-Control": "public, max-age=3600"})
-
-@nodeinfo_router.get("/2.0", response_class=ORJSONResponse)
-def get_nodeinfo_2_0() -> Response:
+def get_nodeinfo_2_0() -> Dict[str, Any]:
     """取得 NodeInfo 2.0 資訊"""
-    data = {
+    return {
         "version": "2.0",
         "software": {
             "name": "readr-mesh-activitypub",
@@ -68,4 +64,17 @@ def get_nodeinfo_2_0() -> Response:
             "themeColor": "#1a1a1a"
         }
     }
-    return ORJSONResponse(data, headers={"Cache-Control": "public, max-age=3600"})
+
+# 內容在程序存活期間不變，啟動時序列化一次即可
+_NODEINFO_BYTES = orjson.dumps(get_nodeinfo())
+_NODEINFO_2_0_BYTES = orjson.dumps(get_nodeinfo_2_0())
+
+@nodeinfo_router.get("", response_class=ORJSONResponse)
+async def nodeinfo_index() -> Response:
+    """/.well-known/nodeinfo discovery endpoint"""
+    return Response(_NODEINFO_BYTES, media_type="application/json", headers=_CACHE_HEADERS)
+
+@nodeinfo_router.get("/2.0", response_class=ORJSONResponse)
+async def nodeinfo_2_0() -> Response:
+    """/.well-known/nodeinfo/2.0 endpoint"""
+    return Response(_NODEINFO_2_0_BYTES, media_type="application/json", headers=_CACHE_HEADERS)
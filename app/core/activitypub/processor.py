@@ -1,60 +1,151 @@
-from typing import Dict, Any, Optional
-import httpx
+import asyncio
+import logging
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
 from app.core.activitypub.utils import generate_actor_id
 from app.core.activitypub.mesh_utils import parse_mesh_pick_from_activity, parse_mesh_comment_from_activity
 from app.core.activitypub.mesh_sync import mesh_sync_manager
-from app.core.graphql_client import GraphQLClient
+from app.core.graphql_client import GraphQLClient, get_graphql_client, MutationBatcher
+
+logger = logging.getLogger(__name__)
+
+# 同時到達的多筆投遞，其 InboxItem 合併為單一 GraphQL mutation 寫入；
+# 處理完成後的 is_processed 標記同樣合併送出
+_inbox_batcher = MutationBatcher(get_graphql_client().create_inbox_items_bulk)
+_inbox_done_batcher = MutationBatcher(get_graphql_client().mark_inbox_items_processed_bulk)
 
 async def process_activity(activity_data: Dict[str, Any], db=None):
     """Process ActivityPub activity"""
     activity_type = activity_data.get("type")
-    
-    if activity_type == "Follow":
-        await process_follow(activity_data, db)
-    elif activity_type == "Accept":
-        await process_accept(activity_data, db)
-    elif activity_type == "Reject":
-        await process_reject(activity_data, db)
-    elif activity_type == "Create":
-        await process_create(activity_data, db)
-    elif activity_type == "Like":
-        await process_like(activity_data, db)
-    elif activity_type == "Announce":
-        await process_announce(activity_data, db)
-    else:
+    handler = _HANDLERS.get(activity_type)
+    if handler is None:
         # Log unknown activity type
-        print(f"Unknown activity type: {activity_type}")
-
-async def process_follow(activity_data: Dict[str, Any], db=None):
-    """Process Follow activity"""
-    # 改為由 mesh_sync_manager 透過 GraphQL 建立追蹤關係
-    await mesh_sync_manager.sync_activity_to_mesh(activity_data, db)
+        logger.warning("Unknown activity type: %s", activity_type)
+        return
+    await handler(activity_data, db)
+
+async def process_inbox_deliveries(deliveries: List[Tuple[Dict[str, Any], Optional[str]]]):
+    """整批處理已寫入的收件匣投遞 (activity, InboxItem id)
+
+    成功者將對應 InboxItem 標記為已處理；失敗者保留未處理狀態。
+    """
+    processed = await process_activities([activity for activity, _ in deliveries])
+    for (_, inbox_item_id), ok in zip(deliveries, processed):
+        if ok and inbox_item_id:
+            await _inbox_done_batcher.enqueue({"id": inbox_item_id})
+
+async def process_inbox_delivery(activity_data: Dict[str, Any], inbox_item_id: Optional[str] = None):
+    """處理單筆已寫入的收件匣投遞"""
+    await process_inbox_deliveries([(activity_data, inbox_item_id)])
+
+# 收件匣背景處理：投遞先寫入 InboxItem（is_processed=False）再排入佇列並回應，
+# 由 worker 於背景處理；程序中斷時未處理的投遞仍留有記錄（佇列滿時 put 會等待，形成背壓）
+INBOX_QUEUE_SIZE = 1000
+INBOX_WORKERS = 4
+# 每個 worker 一次最多取出的投遞數（取出佇列中已有的項目，不額外等待）
+INBOX_BATCH_SIZE = 32
+_inbox_queue: Optional[asyncio.Queue] = None
+_inbox_workers: List[asyncio.Task] = []
+
+async def enqueue_inbox_delivery(activity_data: Dict[str, Any]) -> bool:
+    """寫入 InboxItem 後將投遞排入背景佇列；寫入失敗時回傳 False，呼叫端不應回應 202
+
+    worker 未啟動時（例如未經 app startup）直接處理。
+    """
+    item = await _inbox_batcher.submit({
+        "activity_id": activity_data.get("id"),
+        "actor_id": activity_data.get("actor"),
+        "activity_data": activity_data,
+        "is_processed": False,
+    })
+    if not item:
+        return False
+    if _inbox_queue is None:
+        await process_inbox_delivery(activity_data, item.get("id"))
+    else:
+        await _inbox_queue.put((activity_data, item.get("id")))
+    return True
+
+async def _inbox_worker(queue: asyncio.Queue):
+    while True:
+        deliveries = [await queue.get()]
+        while len(deliveries) < INBOX_BATCH_SIZE and not queue.empty():
+            deliveries.append(queue.get_nowait())
+        try:
+            await process_inbox_deliveries(deliveries)
+        except Exception:
+            logger.exception("Error processing inbox deliveries")
+        finally:
+            for _ in deliveries:
+                queue.task_done()
+
+def start_inbox_workers():
+    global _inbox_queue
+    if _inbox_queue is not None:
+        return
+    _inbox_queue = asyncio.Queue(maxsize=INBOX_QUEUE_SIZE)
+    _inbox_workers.extend(asyncio.create_task(_inbox_worker(_inbox_queue)) for _ in range(INBOX_WORKERS))
+
+async def stop_inbox_workers():
+    """等待佇列中的投遞處理完畢後停止 worker"""
+    global _inbox_queue
+    queue, _inbox_queue = _inbox_queue, None
+    if queue is None:
+        return
+    await queue.join()
+    await _inbox_done_batcher.drain()
+    for task in _inbox_workers:
+        task.cancel()
+    await asyncio.gather(*_inbox_workers, return_exceptions=True)
+    _inbox_workers.clear()
+
+# 以下活動類型全數交由 mesh_sync_manager 同步，可整批處理
+_MESH_SYNC_TYPES = frozenset({"Follow", "Create", "Like", "Announce"})
+
+async def process_activities(activities: List[Dict[str, Any]], db=None) -> List[bool]:
+    """Process a batch of ActivityPub activities
+
+    Mesh 同步類活動整批交給 mesh_sync_manager（Actor/Story 批次預先查詢、
+    Pick/Comment 合併寫入）；其餘活動以有上限的並行數逐筆處理。
+    回傳每筆活動是否處理完成（Mesh 同步回報成功，或未發生例外），順序與輸入相同。
+    """
+    mesh_index = [i for i, a in enumerate(activities) if a.get("type") in _MESH_SYNC_TYPES]
+    other_index = [i for i, a in enumerate(activities) if a.get("type") not in _MESH_SYNC_TYPES]
+    mesh_result, other_results = await asyncio.gather(
+        mesh_sync_manager.sync_activities_batch([activities[i] for i in mesh_index], db),
+        GraphQLClient.map(lambda activity: process_activity(activity, db), [activities[i] for i in other_index], return_exceptions=True),
+        return_exceptions=True,
+    )
+    processed = [True] * len(activities)
+    if isinstance(mesh_result, BaseException):
+        # 批次預先查詢失敗：整批 Mesh 同步皆未完成
+        logger.error("Error syncing activity batch to Mesh: %s", mesh_result)
+        mesh_result = [False] * len(mesh_index)
+    for i, ok in zip(mesh_index, mesh_result):
+        processed[i] = ok
+    for i, result in zip(other_index, other_results):
+        if isinstance(result, BaseException):
+            logger.error("Error processing activity: %s", result, exc_info=result)
+            processed[i] = False
+    return processed
 
 async def process_accept(activity_data: Dict[str, Any], db=None):
     """處理 Accept 活動"""
     # 不再更新本地 Follow 記錄；僅記錄 Activity 以避免重複處理
-    try:
-        gql = GraphQLClient()
-        await gql.create_activity({
-            "activity_id": activity_data.get("id"),
-            "activity_type": "Accept",
-            "object_data": activity_data.get("object"),
-            "target_data": activity_data.get("target"),
-            "is_public": True,
-        })
-    except Exception:
-        pass
+    await _record_follow_response(activity_data, "Accept")
 
 async def process_reject(activity_data: Dict[str, Any], db=None):
     """處理 Reject 活動"""
     # 不再刪除本地 Follow 記錄；僅記錄 Activity 以避免重複處理
+    await _record_follow_response(activity_data, "Reject")
+
+async def _record_follow_response(activity_data: Dict[str, Any], activity_type: str):
+    # 經由 mesh_sync_manager 的批次寫入，同時到達的 Accept/Reject 共用一次 mutation
     try:
-        gql = GraphQLClient()
-        await gql.create_activity({
+        await mesh_sync_manager.record_activity({
             "activity_id": activity_data.get("id"),
-            "activity_type": "Reject",
+            "activity_type": activity_type,
             "object_data": activity_data.get("object"),
             "target_data": activity_data.get("target"),
             "is_public": True,
@@ -62,113 +153,21 @@ async def process_reject(activity_data: Dict[str, Any], db=None):
     except Exception:
         pass
 
-async def process_create(activity_data: Dict[str, Any], db=None):
-    """處理 Create 活動"""
-    object_data = activity_data.get("object", {})
-    object_type = object_data.get("type")
-    
-    if object_type == "Note":
-        # 檢查是否是 Mesh Pick 或 Comment
-        if await is_mesh_pick(object_data):
-            await process_mesh_pick(activity_data, db)
-        elif await is_mesh_comment(object_data):
-            await process_mesh_comment(activity_data, db)
-        else:
-            # 一般 Note
-            await process_note(activity_data, db)
-    elif object_type == "Article":
-        await process_article(activity_data, db)
-
-async def is_mesh_pick(object_data: Dict[str, Any]) -> bool:
-    """檢查是否為 Mesh Pick"""
-    # 檢查是否有 attachment 且包含 Link
-    attachments = object_data.get("attachment", [])
-    for attachment in attachments:
-        if attachment.get("type") == "Link" and attachment.get("href"):
-            return True
-    return False
-
-async def is_mesh_comment(object_data: Dict[str, Any]) -> bool:
-    """檢查是否為 Mesh Comment"""
-    # 檢查是否有 inReplyTo 且指向 Pick
-    in_reply_to = object_data.get("inReplyTo")
-    if in_reply_to and "picks" in in_reply_to:
-        return True
-    return False
-
-async def process_mesh_pick(activity_data: Dict[str, Any], db=None):
-    """Process Mesh Pick activity"""
-    # 直接同步到 Mesh（GraphQL），不再落地本地 DB
-    await mesh_sync_manager.sync_activity_to_mesh(activity_data, db)
-
-async def process_mesh_comment(activity_data: Dict[str, Any], db=None):
-    """Process Mesh Comment activity"""
-    # 直接同步到 Mesh（GraphQL），不再落地本地 DB
-    await mesh_sync_manager.sync_activity_to_mesh(activity_data, db)
-
-async def process_note(activity_data: Dict[str, Any], db=None):
-    """處理一般 Note 活動"""
-    object_data = activity_data.get("object", {})
-    
-    # Note 不再落地 DB，改為依內容轉換至 Mesh（Pick/Comment）
-    await mesh_sync_manager.sync_activity_to_mesh(activity_data, db)
-
-async def process_article(activity_data: Dict[str, Any], db=None):
-    """處理 Article 活動"""
-    object_data = activity_data.get("object", {})
-    
-    # Story 不再落地 DB，由 Mesh 端維護
-    await mesh_sync_manager.sync_activity_to_mesh(activity_data, db)
-
-async def process_like(activity_data: Dict[str, Any], db=None):
-    """Process Like activity"""
-    # TODO: Implement Like processing logic
-    # This needs to handle based on the liked object type (Pick, Comment, Note)
-    # Sync to Mesh system
-    await mesh_sync_manager.sync_activity_to_mesh(activity_data, db)
-
-async def process_announce(activity_data: Dict[str, Any], db=None):
-    """Process Announce activity"""
-    # TODO: Implement Announce processing logic
-    # This is usually repost/share functionality
-    # Sync to Mesh system
-    await mesh_sync_manager.sync_activity_to_mesh(activity_data, db)
+# activity type -> handler；新增活動類型時於此註冊
+# Follow / Create / Like / Announce 直接交給 mesh_sync_manager，
+# 其內部再依 object type 與內容（Pick / Comment / Note）分派
+_HANDLERS = {
+    "Follow": mesh_sync_manager.sync_activity_to_mesh,
+    "Accept": process_accept,
+    "Reject": process_reject,
+    "Create": mesh_sync_manager.sync_activity_to_mesh,
+    "Like": mesh_sync_manager.sync_activity_to_mesh,
+    "Announce": mesh_sync_manager.sync_activity_to_mesh,
+}
 
 # 本檔案不再提供本地 ORM 的 get_or_create 實作，交由 mesh_sync 與 GraphQL 處理
 
-def extract_username_from_actor_id(actor_id: str) -> str:
-    """從 Actor ID 中提取使用者名稱"""
-    if not actor_id:
-        return ""
-    
-    # 格式: https://domain.com/users/username
-    parts = actor_id.split("/")
-    return parts[-1] if parts else ""
-
-def extract_domain_from_actor_id(actor_id: str) -> str:
-    """從 Actor ID 中提取域名"""
-    if not actor_id:
-        return ""
-    
-    # 格式: https://domain.com/users/username
-    from urllib.parse import urlparse
-    parsed = urlparse(actor_id)
-    return parsed.netloc
-
 def extract_actor_id_from_activity(activity_data: Dict[str, Any]) -> int:
     """從活動中提取 Actor ID"""
     # TODO: 實作 Actor ID 提取邏輯
     return 1
-
-def is_public_activity(activity_data: Dict[str, Any]) -> bool:
-    """檢查活動是否為公開"""
-    to = activity_data.get("to", [])
-    cc = activity_data.get("cc", [])
-    
-    public_uris = [
-        "https://www.w3.org/ns/activitystreams#Public",
-        "as:Public",
-        "Public"
-    ]
-    
-    return any(uri in to or uri in cc for uri in public_uris)
@@ -1,50 +1,94 @@
-import uuid
-from datetime import datetime
+import asyncio
+import secrets
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.backends import default_backend
-from app.core.config import settings
+from app.core.config import AP_BASE
 from typing import Union
 
+@lru_cache(maxsize=4096)
 def generate_actor_id(username: str) -> str:
     """生成 Actor ID"""
-    return f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{username}"
+    return f"{AP_BASE}/users/{username}"
+
+# Actor ID 格式固定為 https://domain.com/users/username，直接以字串切割取代 URL 解析
+def extract_username_from_actor_id(actor_id: str) -> str:
+    """從 Actor ID 中提取使用者名稱"""
+    return actor_id.rpartition("/")[2] if actor_id else ""
+
+def extract_domain_from_actor_id(actor_id: str) -> str:
+    """從 Actor ID 中提取域名"""
+    if not actor_id:
+        return ""
+    parts = actor_id.split("/", 3)
+    return parts[2] if len(parts) >= 3 else ""
+
+_ACTIVITY_PREFIX = f"{AP_BASE}/activities/"
+_NOTE_PREFIX = f"{AP_BASE}/notes/"
+
+# (秒數, ISO 字串)：同一秒內建立的物件共用同一個 published 字串
+_iso_tick = (0, "")
+
+def utc_now_iso() -> str:
+    """目前 UTC 時間（精確到秒）的 ISO 8601 字串，以 Z 結尾"""
+    global _iso_tick
+    now = int(time.time())
+    if _iso_tick[0] != now:
+        _iso_tick = (now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)))
+    return _iso_tick[1]
 
 def generate_activity_id(activity_type: str, username: str) -> str:
     """生成 Activity ID"""
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
-    return f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/activities/{activity_type}/{username}/{timestamp}-{unique_id}"
+    timestamp = time.strftime("%Y%m%d%H%M%S", time.gmtime())
+    return _ACTIVITY_PREFIX + activity_type + "/" + username + "/" + timestamp + "-" + secrets.token_hex(4)
 
 def generate_note_id(username: str) -> str:
     """生成 Note ID"""
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
-    return f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/notes/{username}/{timestamp}-{unique_id}"
+    timestamp = time.strftime("%Y%m%d%H%M%S", time.gmtime())
+    return _NOTE_PREFIX + username + "/" + timestamp + "-" + secrets.token_hex(4)
+
+_AS_CONTEXT = "https://www.w3.org/ns/activitystreams"
+
+_ACTOR_CONTEXT = (
+    "https://www.w3.org/ns/activitystreams",
+    "https://w3id.org/security/v1",
+)
+_DEFAULT_AVATAR_URL = f"{AP_BASE}/default-avatar.png"
+
+@lru_cache(maxsize=4096)
+def _actor_static(username: str) -> Dict[str, Any]:
+    """Actor 物件中只由 username 決定的欄位（快取，使用時請複製）"""
+    actor_id = generate_actor_id(username)
+    return {
+        "id": actor_id,
+        "type": "Person",
+        "preferredUsername": username,
+        "inbox": f"{actor_id}/inbox",
+        "outbox": f"{actor_id}/outbox",
+        "followers": f"{actor_id}/followers",
+        "following": f"{actor_id}/following",
+    }
 
 def create_actor_object(actor: Dict[str, Any]) -> Dict[str, Any]:
     """建立 Actor 物件（支援字典格式）"""
-    actor_id = generate_actor_id(actor["username"])
+    username = actor["username"]
+    static = _actor_static(username)
+    actor_id = static["id"]
     
     return {
-        "@context": [
-            "https://www.w3.org/ns/activitystreams",
-            "https://w3id.org/security/v1"
-        ],
-        "id": actor_id,
-        "type": "Person",
-        "preferredUsername": actor["username"],
-        "name": actor.get("display_name") or actor["username"],
+        "@context": list(_ACTOR_CONTEXT),
+        **static,
+        "name": actor.get("display_name") or username,
         "summary": actor.get("summary") or "",
         "icon": {
             "type": "Image",
-            "url": actor.get("icon_url") or f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/default-avatar.png"
+            "url": actor.get("icon_url") or _DEFAULT_AVATAR_URL
         },
-        "inbox": f"{actor_id}/inbox",
-        "outbox": f"{actor_id}/outbox",
-        "followers": f"{actor_id}/followers",
-        "following": f"{actor_id}/following",
         "publicKey": {
             "id": f"{actor_id}#main-key",
             "owner": actor_id,
@@ -52,8 +96,24 @@ def create_actor_object(actor: Dict[str, Any]) -> Dict[str, Any]:
         }
     }
 
-def generate_key_pair() -> tuple[str, str]:
-    """生成 RSA 金鑰對"""
+# RSA 金鑰生成屬 CPU 密集運算，交由獨立程序執行以免阻塞事件迴圈（首次使用時建立）
+_key_pool: Optional[ProcessPoolExecutor] = None
+
+async def generate_key_pair() -> tuple[str, str]:
+    """生成 RSA 金鑰對（於 process pool 中執行）"""
+    global _key_pool
+    if _key_pool is None:
+        # 以 spawn 啟動子程序：此時已有事件迴圈與 log QueueListener 等執行緒，fork 可能繼承被鎖住的 lock
+        _key_pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    return await asyncio.get_running_loop().run_in_executor(_key_pool, _generate_key_pair_sync)
+
+def shutdown_key_pool() -> None:
+    global _key_pool
+    if _key_pool is not None:
+        _key_pool.shutdown(wait=False, cancel_futures=True)
+        _key_pool = None
+
+def _generate_key_pair_sync() -> tuple[str, str]:
     private_key = rsa.generate_private_key(
         public_exponent=65537,
         key_size=2048,
@@ -77,6 +137,14 @@ def generate_key_pair() -> tuple[str, str]:
     
     return public_pem, private_pem
 
+def _username_of(actor: Any) -> str:
+    return actor.username if hasattr(actor, 'username') else actor.get('username')
+
+def _set_present(doc: Dict[str, Any], fields: tuple) -> Dict[str, Any]:
+    """只加入有值的選填欄位（取代逐一 if 判斷）"""
+    doc.update((key, value) for key, value in fields if value)
+    return doc
+
 def create_activity_object(
     activity_type: str,
     actor: Any,
@@ -86,29 +154,16 @@ def create_activity_object(
     cc: Optional[list] = None
 ) -> Dict[str, Any]:
     """建立 Activity 物件"""
-    activity_id = generate_activity_id(activity_type, actor.username)
-    username = actor.username if hasattr(actor, 'username') else actor.get('username')
-    actor_id = generate_actor_id(username)
+    username = _username_of(actor)
     
-    activity = {
-        "@context": "https://www.w3.org/ns/activitystreams",
-        "id": activity_id,
+    return _set_present({
+        "@context": _AS_CONTEXT,
+        "id": generate_activity_id(activity_type, username),
         "type": activity_type,
-        "actor": actor_id,
+        "actor": generate_actor_id(username),
         "object": object_data,
-        "published": datetime.utcnow().isoformat() + "Z"
-    }
-    
-    if target_data:
-        activity["target"] = target_data
-    
-    if to:
-        activity["to"] = to
-    
-    if cc:
-        activity["cc"] = cc
-    
-    return activity
+        "published": utc_now_iso()
+    }, (("target", target_data), ("to", to), ("cc", cc)))
 
 def create_note_object(
     actor: Any,
@@ -122,49 +177,41 @@ def create_note_object(
     tags: Optional[list] = None
 ) -> Dict[str, Any]:
     """建立 Note 物件"""
-    username = actor.username if hasattr(actor, 'username') else actor.get('username')
-    note_id = generate_note_id(username)
-    actor_id = generate_actor_id(username)
+    username = _username_of(actor)
     
-    note = {
-        "@context": "https://www.w3.org/ns/activitystreams",
-        "id": note_id,
+    return _set_present({
+        "@context": _AS_CONTEXT,
+        "id": generate_note_id(username),
         "type": "Note",
-        "attributedTo": actor_id,
+        "attributedTo": generate_actor_id(username),
         "content": content,
         "contentType": content_type,
-        "published": datetime.utcnow().isoformat() + "Z"
-    }
-    
-    if summary:
-        note["summary"] = summary
-    
-    if in_reply_to:
-        note["inReplyTo"] = in_reply_to
-    
-    if to:
-        note["to"] = to
-    
-    if cc:
-        note["cc"] = cc
-    
-    if attachment:
-        note["attachment"] = attachment
-    
-    if tags:
-        note["tag"] = tags
-    
-    return note
+        "published": utc_now_iso()
+    }, (
+        ("summary", summary),
+        ("inReplyTo", in_reply_to),
+        ("to", to),
+        ("cc", cc),
+        ("attachment", attachment),
+        ("tag", tags),
+    ))
+
+_PUBLIC_URIS = frozenset((
+    "https://www.w3.org/ns/activitystreams#Public",
+    "as:Public",
+    "Public",
+))
 
 def is_public_activity(activity: Dict[str, Any]) -> bool:
     """檢查活動是否為公開"""
-    to = activity.get("to", [])
-    cc = activity.get("cc", [])
-    
-    public_uris = [
-        "https://www.w3.org/ns/activitystreams#Public",
-        "as:Public",
-        "Public"
-    ]
-    
-    return any(uri in to or uri in cc for uri in public_uris)
+    for field in ("to", "cc"):
+        recipients = activity.get(field)
+        if not recipients:
+            continue
+        # ActivityStreams 允許單一值，此時為字串而非陣列
+        if isinstance(recipients, str):
+            if recipients in _PUBLIC_URIS:
+                return True
+        elif not _PUBLIC_URIS.isdisjoint(recipients):
+            return True
+    return False
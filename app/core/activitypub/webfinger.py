@@ -1,62 +1,86 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import Dict, Any
+from functools import lru_cache
 import re
+import orjson
 
-from app.core.config import settings
-from app.core.graphql_client import GraphQLClient
-from app.core.activitypub.utils import create_actor_object
+from app.core.config import AP_DOMAIN
+from app.core.graphql_client import get_graphql_client
+from app.core.activitypub.utils import create_actor_object, generate_actor_id
+from app.core.activitypub import processor
 
 from fastapi.responses import ORJSONResponse, RedirectResponse
 webfinger_router = APIRouter()
 
-async def handle_webfinger(resource: str, db=None) -> Dict[str, Any]:
-    """處理 WebFinger 請求"""
+# 格式: acct:username@domain
+_ACCT_RE = re.compile(r'^acct:([^@]+)@(.+)$')
+
+# WebFinger 回應只隨 username 變動：預先序列化範本，請求時只替換佔位字串
+_WF_TEMPLATE = orjson.dumps({
+    "subject": "__SUBJECT__",
+    "links": [
+        {
+            "rel": "self",
+            "type": "application/activity+json",
+            "href": "__ACTOR__"
+        },
+        {
+            "rel": "http://webfinger.net/rel/profile-page",
+            "type": "text/html",
+            "href": "__ACTOR__"
+        },
+        {
+            "rel": "http://schemas.google.com/g/2010#updates-from",
+            "type": "application/atom+xml",
+            "href": "__ACTOR__/outbox"
+        }
+    ]
+})
+
+def _json_str_bytes(value: str) -> bytes:
+    # 以 orjson 轉義後去掉前後引號，確保替換進 JSON 字串內是安全的
+    return orjson.dumps(value)[1:-1]
+
+@lru_cache(maxsize=4096)
+def _webfinger_body(username: str) -> bytes:
+    """依 username 快取已序列化的 WebFinger 回應"""
+    subject = f"acct:{username}@{AP_DOMAIN}"
+    return _WF_TEMPLATE.replace(b"__SUBJECT__", _json_str_bytes(subject)).replace(
+        b"__ACTOR__", _json_str_bytes(generate_actor_id(username))
+    )
+
+async def handle_webfinger(resource: str, db=None) -> bytes:
+    """處理 WebFinger 請求，回傳已序列化的 JRD"""
     # 解析資源 URI
     # 格式: acct:username@domain
-    match = re.match(r'^acct:([^@]+)@(.+)$', resource)
+    match = _ACCT_RE.match(resource) if resource.startswith("acct:") else None
     if not match:
         raise HTTPException(status_code=400, detail="Invalid resource format")
     
     username, domain = match.groups()
     
     # 檢查域名是否匹配
-    if domain != settings.ACTIVITYPUB_DOMAIN:
+    if domain != AP_DOMAIN:
         raise HTTPException(status_code=404, detail="Domain not found")
     
     # 透過 GraphQL 查詢 Actor
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     actor = await gql.get_actor_by_username(username)
     if not actor:
         raise HTTPException(status_code=404, detail="Actor not found")
     
-    # 建立 WebFinger 回應
-    actor_id = f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{username}"
-    
-    return {
-        "subject": resource,
-        "links": [
-            {
-                "rel": "self",
-                "type": "application/activity+json",
-                "href": actor_id
-            },
-            {
-                "rel": "http://webfinger.net/rel/profile-page",
-                "type": "text/html",
-                "href": f"{settings.ACTIVITYPUB_PROTOCOL}://{settings.ACTIVITYPUB_DOMAIN}/users/{username}"
-            },
-            {
-                "rel": "http://schemas.google.com/g/2010#updates-from",
-                "type": "application/atom+xml",
-                "href": f"{actor_id}/outbox"
-            }
-        ]
-    }
+    # 域名已驗證，subject 即為 acct:username@ACTIVITYPUB_DOMAIN，可直接依 username 快取
+    return _webfinger_body(username)
+
+@webfinger_router.get("/webfinger")
+async def webfinger(resource: str):
+    """/.well-known/webfinger discovery endpoint"""
+    return Response(await handle_webfinger(resource), media_type="application/jrd+json")
 
 # 兼容測試腳本：/.well-known/users/{username}
 @webfinger_router.get("/users/{username}")
 async def compat_users(username: str):
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     actor = await gql.get_actor_by_username(username)
     if not actor:
         raise HTTPException(status_code=404, detail="Actor not found")
@@ -67,26 +91,15 @@ async def compat_users(username: str):
 # 兼容測試腳本：/.well-known/inbox/{username}/inbox
 @webfinger_router.post("/inbox/{username}/inbox")
 async def compat_inbox(username: str, request: Request):
-    gql = GraphQLClient()
+    gql = get_graphql_client()
     actor = await gql.get_actor_by_username(username)
     if not actor:
         raise HTTPException(status_code=404, detail="Actor not found")
     try:
-        activity_data = await request.json()
-    except Exception:
+        activity_data = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON")
-    created = await gql.create_inbox_item({
-        "activity_id": activity_data.get("id"),
-        "actor_id": activity_data.get("actor"),
-        "activity_data": activity_data,
-        "is_processed": False,
-    })
-    # 非同步處理（不阻塞回應）
-    try:
-        from app.core.activitypub.processor import process_activity
-        await process_activity(activity_data, None)
-        if created and created.get("id"):
-            await gql.update_inbox_item_processed(created["id"], True)
-    except Exception as e:
-        print(f"Compat inbox process error: {e}")
-    return {"status": "accepted"}
+    # 寫入收件匣後排入背景處理並立即回應；寫入失敗時回應 503 讓對方稍後重送
+    if not await processor.enqueue_inbox_delivery(activity_data):
+        raise HTTPException(status_code=503, detail="Inbox temporarily unavailable")
+    return ORJSONResponse({"status": "accepted"}, status_code=202)
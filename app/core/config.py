@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List, Optional
 import os
 
@@ -14,6 +14,28 @@ class Settings(BaseSettings):
     GRAPHQL_ENDPOINT: str = "http://localhost:3000/api/graphql"
     GRAPHQL_TOKEN: Optional[str] = None
     GRAPHQL_MOCK: bool = True
+    GQL_BATCH_WINDOW_MS: int = 10  # mutation 合併等待時間（毫秒），0 表示不合併
+    GQL_QUERY_BATCH_WINDOW_MS: int = 5  # 查詢合併等待時間（毫秒），0 表示停用；合併失敗時逐筆重送
+    GQL_QUERY_BATCH_MODE: str = "merge"  # "array"：JSON array（需後端支援 batched request）；"merge"：以別名合併為單一查詢
+    GRAPHQL_APQ_ENABLED: bool = False  # Automatic Persisted Queries（需後端支援）
+    GQL_CACHE_TTL: int = 60  # 讀取查詢快取秒數，0 表示停用
+    GQL_STORY_CACHE_TTL: int = 300  # Story 內容變動較少，快取較久
+    GQL_CACHE_MAX_ENTRIES: int = 10000
+    GQL_CACHE_MIN_MS: int = 50  # 後端耗時達此毫秒數的查詢才寫入快取，0 表示全部快取
+    GQL_CACHE_REDIS: bool = False  # 以 REDIS_URL 作為跨 worker 共用的第二層查詢快取（需安裝 redis 套件）
+    GQL_CACHE_L1_TTL: int = 5  # 啟用 Redis 時本地快取秒數
+    GQL_HTTP2: bool = True
+    GQL_HTTP1: bool = True  # 後端為明文 HTTP/2（h2c）時設為 False 以直接使用 HTTP/2
+    GQL_MAX_CONNECTIONS: int = 100
+    GQL_MAX_KEEPALIVE_CONNECTIONS: int = 100
+    GQL_MAX_CONCURRENCY: int = 64  # 同時送往 GraphQL 後端的請求上限
+    GQL_CONNECT_RETRIES: int = 2  # 建立連線失敗時的重試次數
+    GQL_KEEPALIVE_INTERVAL: int = 30  # 背景 ping 間隔秒數，0 表示只在啟動時預熱連線
+    GQL_FANOUT_CONCURRENCY: int = 16  # GraphQLClient.map 預設並行上限
+
+    # GC settings（預設不調整；調整前請先量測記憶體與延遲）
+    GC_GEN0_THRESHOLD: int = 0  # gen0 門檻，0 表示維持 Python 預設值
+    GC_FREEZE_ON_STARTUP: bool = False  # 啟動後以 gc.freeze() 將已載入的物件移出 GC 追蹤
     
     # ActivityPub settings
     ACTIVITYPUB_DOMAIN: str = "activity.readr.tw"
@@ -39,9 +61,15 @@ class Settings(BaseSettings):
     FEDERATION_ENABLED: bool = True
     MAX_FOLLOWERS: int = 10000
     MAX_FOLLOWING: int = 10000
+    ACTOR_CACHE_TTL: int = 3600  # 遠端 Actor 快取秒數（遠端未提供 Cache-Control max-age 時使用）
+    ACTOR_CACHE_MAX_ENTRIES: int = 10000  # 遠端 Actor 快取筆數上限（LRU）
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    # 設定於啟動後不可變更
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, frozen=True)
 
 settings = Settings()
+
+# 熱路徑常用的網域設定，以模組常數提供（避免每次經由 pydantic 屬性存取）
+AP_DOMAIN = settings.ACTIVITYPUB_DOMAIN
+AP_PROTO = settings.ACTIVITYPUB_PROTOCOL
+AP_BASE = f"{AP_PROTO}://{AP_DOMAIN}"
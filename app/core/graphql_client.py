@@ -1,7 +1,224 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import re
+import time
 import httpx
-from typing import Dict, Any, Optional, List
+import orjson
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Iterable, Tuple
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# 單一別名 mutation 內最多合併的筆數
+MAX_BULK_MUTATIONS = 50
+# 清單查詢單次最多取回筆數，避免呼叫端傳入過大 limit
+MAX_LIST_TAKE = 50
+
+# MutationBatcher.enqueue() 允許同時送出中的批次數，超過時呼叫端需等待
+MAX_PENDING_FLUSHES = 200
+
+@functools.lru_cache(maxsize=256)
+def _query_prefix(query: str) -> bytes:
+    """查詢字串序列化後的 payload 前綴（查詢文字只需壓縮空白、跳脫一次，之後只序列化 variables）"""
+    return orjson.dumps({"query": _minify(query)})[:-1] + b',"variables":'
+
+def _minify(query: str) -> str:
+    """壓縮查詢中的縮排與換行（查詢內不含 # 註解或需保留連續空白的字串常值）"""
+    return " ".join(query.split())
+
+@functools.lru_cache(maxsize=256)
+def _apq_extensions(query: str) -> bytes:
+    """Automatic Persisted Query 的 extensions 片段（以查詢文字的 sha256 代替全文）"""
+    sha = hashlib.sha256(_minify(query).encode()).hexdigest()
+    return b'"extensions":{"persistedQuery":{"version":1,"sha256Hash":"' + sha.encode() + b'"}}'
+
+# Mesh 輸入欄位 -> Keystone 欄位；關聯欄位以 connect 包裝（值為空時略過），純量欄位僅略過 None
+_PICK_CONNECT_KEYS = (("storyId", "story"), ("memberId", "member"))
+_PICK_SCALAR_KEYS = (("objective", "objective"), ("kind", "kind"), ("paywall", "paywall"), ("pickedDate", "picked_date"))
+_COMMENT_CONNECT_KEYS = (("memberId", "member"), ("pickId", "pick"), ("parentId", "parent"), ("storyId", "story"))
+_COMMENT_SCALAR_KEYS = (("content", "content"), ("publishedDate", "published_date"))
+
+def _to_create_input(input_data: Dict[str, Any], connect_keys: tuple, scalar_keys: tuple) -> Dict[str, Any]:
+    data = {dst: {"connect": {"id": input_data[src]}} for src, dst in connect_keys if input_data.get(src)}
+    data.update((dst, input_data[src]) for src, dst in scalar_keys if input_data.get(src) is not None)
+    return data
+
+# 無變數查詢共用的空 variables（只被序列化，不會被修改）
+_NO_VARIABLES: Dict[str, Any] = {}
+
+def _pluck(result: Any, *path: str, default: Any = None) -> Any:
+    """依序取出巢狀欄位；任一層缺少或為 null（如 GraphQL 錯誤時 data 為 null）即回傳 default"""
+    cur = result
+    for key in path:
+        if not isinstance(cur, dict):
+            return default
+        cur = cur.get(key)
+    return default if cur is None else cur
+
+_OPERATION_RE = re.compile(r"^\s*query\b\s*\w*\s*(?:\(([^)]*)\))?\s*\{", re.S)
+_VARIABLE_RE = re.compile(r"\$(\w+)")
+
+def _prefix_root_fields(body: str, prefix: str) -> Tuple[str, Dict[str, str]]:
+    """為選取集最上層欄位加上別名前綴，回傳 (改寫後內容, 別名 -> 原回應欄位名)"""
+    out: List[str] = []
+    aliases: Dict[str, str] = {}
+    depth = 0
+    i, n = 0, len(body)
+    while i < n:
+        ch = body[i]
+        if ch == '"':
+            end = body.index('"', i + 1)
+            while body[end - 1] == "\\":
+                end = body.index('"', end + 1)
+            out.append(body[i:end + 1])
+            i = end + 1
+            continue
+        if ch in "{(":
+            depth += 1
+        elif ch in "})":
+            depth -= 1
+        elif depth == 0 and (ch.isalpha() or ch == "_"):
+            j = i
+            while j < n and (body[j].isalnum() or body[j] == "_"):
+                j += 1
+            name = body[i:j]
+            k = j
+            while k < n and body[k].isspace():
+                k += 1
+            alias = prefix + name
+            if k < n and body[k] == ":":
+                # 原本就有別名：改寫別名本身，略過其後的欄位名稱
+                aliases[alias] = name
+                out.append(alias)
+                k += 1
+                while k < n and body[k].isspace():
+                    k += 1
+                j = k
+                while j < n and (body[j].isalnum() or body[j] == "_"):
+                    j += 1
+                out.append(": " + body[k:j])
+            else:
+                aliases[alias] = name
+                out.append(f"{alias}: {name}")
+            i = j
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out), aliases
+
+def _is_mergeable(query: str) -> bool:
+    """只合併單一 query 操作（不含 fragment）；其他形式照原樣送出"""
+    if "fragment " in query or "..." in query:
+        return False
+    return bool(_OPERATION_RE.match(query)) or query.lstrip().startswith("{")
+
+def _merge_queries(payloads: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
+    """將多筆查詢合併為單一 GraphQL 文件（欄位與變數加上 q<i>_ 前綴），供不支援 array batch 的後端使用"""
+    var_defs: List[str] = []
+    bodies: List[str] = []
+    variables: Dict[str, Any] = {}
+    alias_maps: List[Dict[str, str]] = []
+    for index, payload in enumerate(payloads):
+        prefix = f"q{index}_"
+        query = payload["query"]
+        match = _OPERATION_RE.match(query)
+        if match:
+            defs, body = match.group(1), query[match.end():query.rindex("}")]
+        else:
+            defs, body = None, query[query.index("{") + 1:query.rindex("}")]
+        if defs:
+            var_defs.append(_VARIABLE_RE.sub(lambda m: "$" + prefix + m.group(1), defs))
+        body, aliases = _prefix_root_fields(_VARIABLE_RE.sub(lambda m: "$" + prefix + m.group(1), body), prefix)
+        bodies.append(body)
+        alias_maps.append(aliases)
+        variables.update((prefix + key, value) for key, value in (payload.get("variables") or {}).items())
+    header = f"query MergedQuery({', '.join(var_defs)})" if var_defs else "query MergedQuery"
+    return {"query": header + " {" + "\n".join(bodies) + "}", "variables": variables}, alias_maps
+
+def _split_merged_result(result: Dict[str, Any], alias_maps: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    data = result.get("data")
+    errors = result.get("errors") or []
+    results: List[Dict[str, Any]] = []
+    for index, aliases in enumerate(alias_maps):
+        item: Dict[str, Any] = {
+            "data": {name: data.get(alias) for alias, name in aliases.items()} if isinstance(data, dict) else None
+        }
+        prefix = f"q{index}_"
+        # 依 error path 的第一段別名歸屬（無 path 的錯誤由 _merged_failed 改為逐筆重送，不會到這裡）
+        own = [e for e in errors if e.get("path") and str(e["path"][0]).startswith(prefix)]
+        if own:
+            item["errors"] = own
+        results.append(item)
+    return results
+
+def _merged_failed(result: Any) -> bool:
+    """合併查詢是否整份失敗：請求例外、沒有 data，或有無法歸屬到個別查詢的錯誤（無 path，如驗證錯誤）"""
+    if isinstance(result, BaseException) or not isinstance(result, dict) or result.get("data") is None:
+        return True
+    return any(not isinstance(e, dict) or not e.get("path") for e in result.get("errors") or ())
+
+class GraphQLResponseError(ValueError):
+    """後端回應不是預期的 GraphQL 回應格式"""
+
+def _check_response(result: Any) -> None:
+    """檢查回應是否為 GraphQL 回應物件；後端回報的 errors 記錄於 log（各方法仍依 data 取值）"""
+    if not isinstance(result, dict) or ("data" not in result and "errors" not in result):
+        raise GraphQLResponseError(f"Unexpected GraphQL response: {str(result)[:200]}")
+    errors = result.get("errors")
+    if errors:
+        logger.warning("GraphQL errors: %s", "; ".join(str(e.get("message", e)) if isinstance(e, dict) else str(e) for e in errors))
+
+def _persisted_query_not_found(result: Any) -> bool:
+    if not isinstance(result, dict):
+        return False
+    return any(
+        (error.get("extensions") or {}).get("code") == "PERSISTED_QUERY_NOT_FOUND"
+        or error.get("message") == "PersistedQueryNotFound"
+        for error in result.get("errors") or ()
+    )
+
+def create_http_client() -> httpx.AsyncClient:
+    """建立連往 GraphQL 後端的共享 httpx client
+
+    以 HTTP/2 讓並行查詢在同一連線上多工；明文 http:// 後端需將 GQL_HTTP1 設為 False
+    （h2c prior knowledge），否則 httpx 會退回 HTTP/1.1。
+    """
+    # 連線失敗（connect 階段）由 transport 自動重試；已送出的請求不重試，避免 mutation 重複寫入
+    transport = httpx.AsyncHTTPTransport(
+        http2=settings.GQL_HTTP2,
+        http1=settings.GQL_HTTP1 or not settings.GQL_HTTP2,
+        retries=settings.GQL_CONNECT_RETRIES,
+        limits=httpx.Limits(
+            max_connections=settings.GQL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GQL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=30.0,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(10.0, read=20.0),
+        headers={"User-Agent": "readr-mesh-ap/1.0"},
+    )
+
+# 視為後端暫時失敗、改回傳預設值的例外；其餘例外（KeyError、TypeError 等程式錯誤）照常拋出
+_BACKEND_ERRORS = (httpx.HTTPError, orjson.JSONDecodeError, GraphQLResponseError)
+
+def _safe(action: str, default: Any = None):
+    """包裝 client 方法：後端請求失敗時記錄 log 並回傳預設值（default 可為 list/dict 等工廠，避免共用可變物件）"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except _BACKEND_ERRORS:
+                logger.exception("Error %s", action)
+                return default() if callable(default) else default
+        return wrapper
+    return decorator
+
 class GraphQLClient:
     """GraphQL client"""
     # 共享 httpx AsyncClient（由應用啟動時注入）
@@ -11,36 +228,300 @@ class GraphQLClient:
     def set_shared_client(cls, client: Optional[httpx.AsyncClient]) -> None:
         cls.shared_client = client
     
+    @classmethod
+    def _ensure_shared_client(cls) -> httpx.AsyncClient:
+        """未於啟動時注入時（如獨立腳本），首次查詢延遲建立共享 client"""
+        if cls.shared_client is None or cls.shared_client.is_closed:
+            cls.shared_client = create_http_client()
+        return cls.shared_client
+    
+    @classmethod
+    async def close_shared_client(cls) -> None:
+        client, cls.shared_client = cls.shared_client, None
+        if client is not None:
+            await client.aclose()
+    
     def __init__(self, endpoint: Optional[str] = None, token: Optional[str] = None, client: Optional[httpx.AsyncClient] = None):
         self.endpoint = endpoint or settings.GRAPHQL_ENDPOINT
         self.token = token or settings.GRAPHQL_TOKEN
-        # 優先採用注入 client；否則採用 shared_client；最後回退到本地臨時 client
-        self.client = client or GraphQLClient.shared_client
+        # 優先採用注入 client；否則採用 shared_client（未注入時延遲建立）
+        self.client = client
         self.headers = {
             "Content-Type": "application/json",
         }
         if self.token:
             self.headers["Authorization"] = f"Bearer {self.token}"
+        # 查詢合併（方式見 _post_batch）；GQL_QUERY_BATCH_WINDOW_MS 為 0 時停用
+        self._query_batcher: Optional[MutationBatcher] = None
+        if settings.GQL_QUERY_BATCH_WINDOW_MS > 0:
+            self._query_batcher = MutationBatcher(self._post_batch, max_delay=settings.GQL_QUERY_BATCH_WINDOW_MS / 1000)
+        # 讀取查詢快取：key -> (到期時間, tag, 結果)；tag 為實體標記（如 member:<id>），供 mutation 後失效
+        self._cache: "OrderedDict[bytes, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._cache_tags: Dict[str, set] = {}
+        # 進行中的相同查詢共用同一個 task，避免並行請求重複送出
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        # 第二層快取（Redis，跨 worker 共用）；GQL_CACHE_REDIS 開啟時於首次使用延遲連線
+        self._redis: Any = None
+        self._redis_enabled = settings.GQL_CACHE_REDIS
+        # 限制同時送往後端的請求數，超出者在此排隊而非堆在連線池
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def close(self) -> None:
+        """關閉此實例注入的 client；共享 client 由 close_shared_client() 於應用關閉時釋放"""
+        if self.client is not None:
+            await self.client.aclose()
     
-    async def query(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def __aenter__(self) -> "GraphQLClient":
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+    
+    async def query(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None,
+        cache_tag: Optional[str] = None,
+        cache_ttl: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """執行查詢；指定 cache_tag 時結果依 cache_ttl（預設 GQL_CACHE_TTL）秒快取"""
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"data": {"mock": True}}
-        payload = {"query": query, "variables": variables or {}}
-        # 優先使用注入或共享 client，否則回退到臨時 client
-        client: Optional[httpx.AsyncClient] = self.client
-        if client is not None:
-            response = await client.post(self.endpoint, json=payload, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        # 回退：與舊邏輯相容
-        async with httpx.AsyncClient() as temp_client:
-            response = await temp_client.post(self.endpoint, json=payload, headers=self.headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
+        if not variables:
+            variables = _NO_VARIABLES
+        key = hashlib.blake2b(
+            _query_prefix(query) + orjson.dumps(variables, option=orjson.OPT_SORT_KEYS),
+            digest_size=16,
+        ).digest()
+        ttl = settings.GQL_CACHE_TTL if cache_ttl is None else cache_ttl
+        use_cache = cache_tag is not None and ttl > 0
+        if use_cache:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                return cached[2]
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            # payload 只在真正送出時建立；快取命中或共用進行中查詢時不配置
+            payload = {"query": query, "variables": variables}
+            task = asyncio.ensure_future(self._send_cached(payload, key, cache_tag if use_cache else None, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._inflight.pop(k, None) if self._inflight.get(k) is t else None)
+        # shield：單一呼叫者被取消時不影響其他共用同一查詢的呼叫者
+        result, cacheable = await asyncio.shield(task)
+        if use_cache and cacheable:
+            self._cache_put(key, cache_tag, result, ttl)
+        return result
+    
+    async def _send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self._query_batcher is not None:
+            return await self._query_batcher.submit(payload)
+        return await self._post(payload)
+    
+    async def _send_cached(
+        self, payload: Dict[str, Any], key: bytes, tag: Optional[str], ttl: int = 0
+    ) -> Tuple[Dict[str, Any], bool]:
+        """送出查詢並回傳 (結果, 是否寫入快取)
+
+        tag 為 None 時不快取。本地快取未命中時先查 Redis；向後端查詢耗時未達 GQL_CACHE_MIN_MS
+        的結果不寫入快取，把快取空間留給昂貴的查詢。
+        """
+        if tag is None:
+            return await self._send(payload), False
+        redis = self._get_redis()
+        redis_key = "gql:" + key.hex()
+        if redis is not None:
+            try:
+                cached = await redis.get(redis_key)
+                if cached is not None:
+                    return orjson.loads(cached), True
+            except Exception:
+                logger.warning("Redis cache read failed", exc_info=True)
+        started = time.perf_counter()
+        result = await self._send(payload)
+        cacheable = (
+            not result.get("errors")
+            and (time.perf_counter() - started) * 1000 >= settings.GQL_CACHE_MIN_MS
+        )
+        if cacheable and redis is not None:
+            try:
+                tag_key = "gqltag:" + tag
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.set(redis_key, orjson.dumps(result), ex=ttl)
+                    pipe.sadd(tag_key, redis_key)
+                    pipe.expire(tag_key, ttl)
+                    await pipe.execute()
+            except Exception:
+                logger.warning("Redis cache write failed", exc_info=True)
+        return result, cacheable
+    
+    def _get_redis(self) -> Any:
+        if not self._redis_enabled:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError:
+                logger.warning("GQL_CACHE_REDIS is set but the redis package is not installed; using local cache only")
+                self._redis_enabled = False
+                return None
+            self._redis = redis_asyncio.from_url(settings.REDIS_URL)
+        return self._redis
+    
+    def _cache_put(self, key: bytes, tag: str, result: Dict[str, Any], ttl: int) -> None:
+        # 啟用 Redis 時本地快取只保留短時間，使其他 worker 的失效能及時生效
+        if self._redis_enabled:
+            ttl = min(ttl, settings.GQL_CACHE_L1_TTL)
+        self._cache[key] = (time.monotonic() + ttl, tag, result)
+        self._cache.move_to_end(key)
+        self._cache_tags.setdefault(tag, set()).add(key)
+        while len(self._cache) > settings.GQL_CACHE_MAX_ENTRIES:
+            old_key, (_, old_tag, _) = self._cache.popitem(last=False)
+            keys = self._cache_tags.get(old_tag)
+            if keys is not None:
+                keys.discard(old_key)
+                if not keys:
+                    del self._cache_tags[old_tag]
+    
+    async def invalidate(self, tag: str) -> None:
+        """使指定實體標記的快取查詢失效（於對應的 mutation 後呼叫）"""
+        for key in self._cache_tags.pop(tag, ()):
+            self._cache.pop(key, None)
+        redis = self._get_redis()
+        if redis is None:
+            return
+        tag_key = "gqltag:" + tag
+        try:
+            keys = await redis.smembers(tag_key)
+            await redis.delete(tag_key, *keys)
+        except Exception:
+            logger.warning("Redis cache invalidation failed", exc_info=True)
     
     async def mutation(self, mutation: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        return await self.query(mutation, variables)
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return {"data": {"mock": True}}
+        # mutation 不經查詢合併，維持送出順序
+        return await self._post({"query": mutation, "variables": variables or {}})
+    
+    async def _post(self, payload: Any, persisted: bool = True) -> Any:
+        result = await self._post_raw(payload, persisted)
+        for item in (result if isinstance(result, list) else (result,)):
+            _check_response(item)
+        return result
+    
+    async def _post_raw(self, payload: Any, persisted: bool = True) -> Any:
+        if not isinstance(payload, dict):
+            return await self._post_body(orjson.dumps(payload))
+        variables = orjson.dumps(payload["variables"])
+        if persisted and settings.GRAPHQL_APQ_ENABLED:
+            # 先只送 hash；後端尚未登錄此查詢時再附上全文（同時完成登錄）
+            extensions = _apq_extensions(payload["query"])
+            result = await self._post_body(b"{" + extensions + b',"variables":' + variables + b"}", allow_error_status=True)
+            if not _persisted_query_not_found(result):
+                return result
+            return await self._post_body(_query_prefix(payload["query"]) + variables + b"," + extensions + b"}")
+        if not persisted:
+            # 一次性的文件（如合併查詢）不寫入 _query_prefix 的 LRU，以免擠掉常用查詢的前綴
+            return await self._post_body(_query_prefix.__wrapped__(payload["query"]) + variables + b"}")
+        return await self._post_body(_query_prefix(payload["query"]) + variables + b"}")
+    
+    async def _post_body(self, body: bytes, allow_error_status: bool = False) -> Any:
+        # shared_client 於呼叫時才讀取，啟動前建立的實例也能使用連線池；不再每次建立臨時 client
+        client = self.client or GraphQLClient.shared_client or GraphQLClient._ensure_shared_client()
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            # Semaphore 綁定事件迴圈，迴圈更換時（例如測試中多次 asyncio.run）重新建立
+            self._semaphore, self._semaphore_loop = asyncio.Semaphore(settings.GQL_MAX_CONCURRENCY), loop
+        async with self._semaphore:
+            response = await client.post(self.endpoint, content=body, headers=self.headers)
+        if allow_error_status and response.is_error:
+            # PERSISTED_QUERY_NOT_FOUND 依伺服器版本可能以 4xx 回應，需先檢查內容
+            try:
+                result = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                result = None
+            if _persisted_query_not_found(result):
+                return result
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    async def _post_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """以單一 HTTP 請求送出多筆查詢，回應依序對應
+
+        GQL_QUERY_BATCH_MODE 為 "array" 時送出 JSON array（需後端開啟 batched request）；
+        為 "merge" 時以別名合併成單一查詢文件，任何 GraphQL 後端皆可接受。
+        """
+        if len(payloads) == 1:
+            return [await self._post(payloads[0])]
+        if settings.GQL_QUERY_BATCH_MODE == "merge":
+            mergeable = [i for i, p in enumerate(payloads) if _is_mergeable(p["query"])]
+            if len(mergeable) < 2:
+                return await self._post_each(payloads)
+            merged_payloads = [payloads[i] for i in mergeable]
+            merged, alias_maps = _merge_queries(merged_payloads)
+            # 無法合併的查詢（如含 fragment）與合併文件並行送出
+            rest = [i for i in range(len(payloads)) if i not in set(mergeable)]
+            # 合併後的文件每次組合不同，不走 persisted query（否則幾乎都會多一次往返）
+            merged_result, *rest_results = await asyncio.gather(
+                self._post(merged, persisted=False),
+                *(self._post(payloads[i]) for i in rest),
+                return_exceptions=True,
+            )
+            if _merged_failed(merged_result):
+                # 整份文件失敗時無法判斷是哪一筆造成，改為逐筆重送，只讓出錯的那筆失敗
+                logger.warning("Merged GraphQL query failed, retrying %d queries individually", len(merged_payloads))
+                split = await self._post_each(merged_payloads)
+            else:
+                split = _split_merged_result(merged_result, alias_maps)
+            results: List[Any] = [None] * len(payloads)
+            for i, item in zip(mergeable, split):
+                results[i] = item
+            for i, item in zip(rest, rest_results):
+                results[i] = item
+            return results
+        try:
+            results = await self._post(payloads)
+        except Exception:
+            logger.warning("Batched GraphQL request failed, retrying %d queries individually", len(payloads))
+            return await self._post_each(payloads)
+        if not isinstance(results, list) or len(results) != len(payloads):
+            raise GraphQLResponseError("GraphQL batch response does not match request")
+        return results
     
+    async def _post_each(self, payloads: List[Dict[str, Any]]) -> List[Any]:
+        """逐筆並行送出；個別失敗以例外物件回傳，由 MutationBatcher 交給對應的呼叫者"""
+        return list(await asyncio.gather(*(self._post(p) for p in payloads), return_exceptions=True))
+    
+    @staticmethod
+    async def map(
+        coro_fn: Callable[[Any], Awaitable[Any]],
+        items: Iterable[Any],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """以有上限的並行數對每個項目執行 coro_fn，結果依輸入順序回傳
+
+        對大量收件匣或活動扇出時請用此方法取代直接 asyncio.gather，
+        避免一次排入過多 Task 讓最早的請求遲遲得不到執行。
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.GQL_FANOUT_CONCURRENCY)
+        
+        async def run(item: Any) -> Any:
+            async with semaphore:
+                return await coro_fn(item)
+        
+        return list(await asyncio.gather(*(run(item) for item in items), return_exceptions=return_exceptions))
+    
+    @_safe("pinging GraphQL endpoint", default=False)
+    async def ping(self) -> bool:
+        """送出最小查詢以建立（或維持）與後端的連線"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return True
+        await self._post({"query": "{ __typename }", "variables": {}})
+        return True
+    
+    @_safe("fetching member")
     async def get_member(self, member_id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {
@@ -77,13 +558,10 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.query(query, {"id": member_id})
-            return result.get("data", {}).get("Member")
-        except Exception as e:
-            print(f"Error fetching member: {e}")
-            return None
+        result = await self.query(query, {"id": member_id}, cache_tag=f"member:{member_id}")
+        return _pluck(result, "data", "Member")
     
+    @_safe("fetching actor")
     async def get_actor_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {
@@ -92,37 +570,57 @@ class GraphQLClient:
                 "domain": settings.ACTIVITYPUB_DOMAIN,
                 "display_name": username,
                 "is_local": True,
+                "mesh_member": {"id": "mock-member-id"},
             }
         query = """
         query GetAPActor($username: String!) {
           ActivityPubActors(where: { username: { equals: $username } }, take: 1) {
-            id username domain display_name summary icon_url inbox_url outbox_url followers_url following_url public_key_pem private_key_pem is_local
+            id username domain display_name summary icon_url inbox_url outbox_url followers_url following_url public_key_pem is_local
+            mesh_member { id }
           }
         }
         """
-        try:
-            result = await self.query(query, {"username": username})
-            items = result.get("data", {}).get("ActivityPubActors", [])
-            return items[0] if items else None
-        except Exception as e:
-            print(f"Error fetching actor: {e}")
-            return None
+        # 結果會進入快取（可能寫入 Redis），不選取 private_key_pem
+        result = await self.query(query, {"username": username}, cache_tag=f"actor:{username}")
+        items = _pluck(result, "data", "ActivityPubActors", default=[])
+        return items[0] if items else None
 
+    @_safe("fetching actors", default=dict)
+    async def get_actors_by_usernames(self, usernames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """以單一 `in` 查詢批次取得多個 Actor，回傳 username -> actor"""
+        if not usernames:
+            return {}
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return {username: await self.get_actor_by_username(username) for username in usernames}
+        query = """
+        query GetAPActors($usernames: [String!]!) {
+          ActivityPubActors(where: { username: { in: $usernames } }) {
+            id username domain display_name summary icon_url inbox_url outbox_url is_local mesh_member { id }
+          }
+        }
+        """
+        result = await self.query(query, {"usernames": usernames})
+        items = _pluck(result, "data", "ActivityPubActors", default=[])
+        return {item["username"]: item for item in items}
+
+    @_safe("creating actor")
     async def create_actor(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": "mock-actor-id"}
         mutation = """
         mutation CreateAPActor($data: ActivityPubActorCreateInput!) {
-          createActivityPubActor(data: $data) { id }
+          createActivityPubActor(data: $data) { id username mesh_member { id } }
         }
         """
         try:
             result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createActivityPubActor")
-        except Exception as e:
-            print(f"Error creating actor: {e}")
-            return None
+        finally:
+            # 快取中可能有「查無此 Actor」的結果；建立失敗（例如已由其他 worker 建立）時同樣需清除
+            if data.get("username"):
+                await self.invalidate(f"actor:{data['username']}")
+        return _pluck(result, "data", "createActivityPubActor")
     
+    @_safe("fetching story")
     async def get_story(self, story_id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {
@@ -140,13 +638,10 @@ class GraphQLClient:
             Story(where: { id: $id }) { id title url image published_date state is_active }
         }
         """
-        try:
-            result = await self.query(query, {"id": story_id})
-            return result.get("data", {}).get("Story")
-        except Exception as e:
-            print(f"Error fetching story: {e}")
-            return None
+        result = await self.query(query, {"id": story_id}, cache_tag=f"story:{story_id}", cache_ttl=settings.GQL_STORY_CACHE_TTL)
+        return _pluck(result, "data", "Story")
 
+    @_safe("fetching story by url")
     async def get_story_by_url(self, url: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": "mock-story-id", "url": url}
@@ -155,14 +650,27 @@ class GraphQLClient:
           Stories(where: { url: { equals: $url } }, take: 1) { id title url image published_date state is_active }
         }
         """
-        try:
-            result = await self.query(query, {"url": url})
-            items = result.get("data", {}).get("Stories", [])
-            return items[0] if items else None
-        except Exception as e:
-            print(f"Error fetching story by url: {e}")
-            return None
+        result = await self.query(query, {"url": url})
+        items = _pluck(result, "data", "Stories", default=[])
+        return items[0] if items else None
+
+    @_safe("fetching stories by urls", default=dict)
+    async def get_stories_by_urls(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """以單一 `in` 查詢批次取得多個 Story，回傳 url -> story"""
+        if not urls:
+            return {}
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return {url: {"id": "mock-story-id", "url": url} for url in urls}
+        query = """
+        query GetStoriesByUrls($urls: [String!]!) {
+          Stories(where: { url: { in: $urls } }) { id title url image published_date state is_active }
+        }
+        """
+        result = await self.query(query, {"urls": urls})
+        items = _pluck(result, "data", "Stories", default=[])
+        return {item["url"]: item for item in items}
 
+    @_safe("creating story")
     async def create_story(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": "mock-story-id"}
@@ -171,13 +679,10 @@ class GraphQLClient:
           createStory(data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createStory")
-        except Exception as e:
-            print(f"Error creating story: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createStory")
     
+    @_safe("creating pick")
     async def create_pick(self, input_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """依 Keystone 6 的 createPick(data: PickCreateInput!) 格式組裝資料
 
@@ -199,32 +704,29 @@ class GraphQLClient:
         """
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": "mock-pick-id"}
-        data: Dict[str, Any] = {}
-        if input_data.get("storyId"):
-            data["story"] = {"connect": {"id": input_data["storyId"]}}
-        if input_data.get("memberId"):
-            data["member"] = {"connect": {"id": input_data["memberId"]}}
-        if input_data.get("objective") is not None:
-            data["objective"] = input_data["objective"]
-        if input_data.get("kind") is not None:
-            data["kind"] = input_data["kind"]
-        if input_data.get("paywall") is not None:
-            data["paywall"] = input_data["paywall"]
-        if input_data.get("pickedDate") is not None:
-            data["picked_date"] = input_data["pickedDate"]
+        data = self._build_pick_data(input_data)
 
         mutation = """
         mutation CreatePick($data: PickCreateInput!) {
             createPick(data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createPick")
-        except Exception as e:
-            print(f"Error creating pick: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createPick")
+
+    @staticmethod
+    def _build_pick_data(input_data: Dict[str, Any]) -> Dict[str, Any]:
+        return _to_create_input(input_data, _PICK_CONNECT_KEYS, _PICK_SCALAR_KEYS)
+
+    async def create_picks_bulk(self, inputs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """以別名（p0, p1, ...）將多筆 createPick 合併成單一請求，回傳順序與 inputs 相同"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return [{"id": "mock-pick-id"} for _ in inputs]
+        return await self._bulk_create(
+            [self._build_pick_data(i) for i in inputs], "CreatePicks", "createPick", "PickCreateInput", "p"
+        )
     
+    @_safe("creating comment")
     async def create_comment(self, input_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """將簡化鍵轉為 Keystone 關聯輸入
 
@@ -235,32 +737,91 @@ class GraphQLClient:
         """
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": "mock-comment-id"}
-        data: Dict[str, Any] = {}
-        if input_data.get("content") is not None:
-            data["content"] = input_data["content"]
-        if input_data.get("publishedDate") is not None:
-            data["published_date"] = input_data["publishedDate"]
-        if input_data.get("memberId"):
-            data["member"] = {"connect": {"id": input_data["memberId"]}}
-        if input_data.get("pickId"):
-            data["pick"] = {"connect": {"id": input_data["pickId"]}}
-        if input_data.get("parentId"):
-            data["parent"] = {"connect": {"id": input_data["parentId"]}}
-        if input_data.get("storyId"):
-            data["story"] = {"connect": {"id": input_data["storyId"]}}
+        data = self._build_comment_data(input_data)
 
         mutation = """
         mutation CreateComment($data: CommentCreateInput!) {
             createComment(data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createComment")
-        except Exception as e:
-            print(f"Error creating comment: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createComment")
+
+    @staticmethod
+    def _build_comment_data(input_data: Dict[str, Any]) -> Dict[str, Any]:
+        return _to_create_input(input_data, _COMMENT_CONNECT_KEYS, _COMMENT_SCALAR_KEYS)
+
+    async def create_comments_bulk(self, inputs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """以別名（c0, c1, ...）將多筆 createComment 合併成單一請求，回傳順序與 inputs 相同"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return [{"id": "mock-comment-id"} for _ in inputs]
+        return await self._bulk_create(
+            [self._build_comment_data(i) for i in inputs], "CreateComments", "createComment", "CommentCreateInput", "c"
+        )
+
+    async def _bulk_create(
+        self, items: List[Dict[str, Any]], op_name: str, field: str, input_type: str, prefix: str
+    ) -> List[Optional[Dict[str, Any]]]:
+        """每 MAX_BULK_MUTATIONS 筆組一個別名 mutation，依序以 alias 對回結果"""
+        results: List[Optional[Dict[str, Any]]] = []
+        for start in range(0, len(items), MAX_BULK_MUTATIONS):
+            chunk = items[start:start + MAX_BULK_MUTATIONS]
+            var_defs = ", ".join(f"$i{k}: {input_type}!" for k in range(len(chunk)))
+            fields = " ".join(f"{prefix}{k}: {field}(data: $i{k}) {{ id }}" for k in range(len(chunk)))
+            mutation = f"mutation {op_name}({var_defs}) {{ {fields} }}"
+            try:
+                result = await self.mutation(mutation, {f"i{k}": data for k, data in enumerate(chunk)})
+                data = result.get("data") or {}
+                results.extend(data.get(f"{prefix}{k}") for k in range(len(chunk)))
+            except _BACKEND_ERRORS:
+                logger.exception("Error running bulk %s", field)
+                results.extend(None for _ in chunk)
+        return results
+    
+    async def _bulk_update(
+        self, items: List[Tuple[str, Dict[str, Any]]], op_name: str, field: str, list_key: str, prefix: str
+    ) -> List[Optional[Dict[str, Any]]]:
+        """同 _bulk_create，items 為 (id, data)；以別名合併多筆 update mutation"""
+        results: List[Optional[Dict[str, Any]]] = []
+        for start in range(0, len(items), MAX_BULK_MUTATIONS):
+            chunk = items[start:start + MAX_BULK_MUTATIONS]
+            var_defs = ", ".join(f"$w{k}: ID!, $i{k}: {list_key}UpdateInput!" for k in range(len(chunk)))
+            fields = " ".join(
+                f"{prefix}{k}: {field}(where: {{ id: $w{k} }}, data: $i{k}) {{ id }}" for k in range(len(chunk))
+            )
+            mutation = f"mutation {op_name}({var_defs}) {{ {fields} }}"
+            variables: Dict[str, Any] = {}
+            for k, (item_id, data) in enumerate(chunk):
+                variables[f"w{k}"] = item_id
+                variables[f"i{k}"] = data
+            try:
+                result = await self.mutation(mutation, variables)
+                data = result.get("data") or {}
+                results.extend(data.get(f"{prefix}{k}") for k in range(len(chunk)))
+            except _BACKEND_ERRORS:
+                logger.exception("Error running bulk %s", field)
+                results.extend(None for _ in chunk)
+        return results
+    
+    async def like_comments_bulk(self, items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """合併多筆 Comment like（items 含 commentId、memberId），供 MutationBatcher 使用"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return [{"id": item["commentId"]} for item in items]
+        return await self._bulk_update(
+            [(item["commentId"], {"like": {"connect": {"id": item["memberId"]}}}) for item in items],
+            "LikeComments", "updateComment", "Comment", "l",
+        )
     
+    async def follow_members_bulk(self, items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """合併多筆追蹤關係（items 含 followerId、followingId），供 MutationBatcher 使用"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return [{"id": item["followerId"]} for item in items]
+        return await self._bulk_update(
+            [(item["followerId"], {"following": {"connect": {"id": item["followingId"]}}}) for item in items],
+            "FollowMembers", "updateMember", "Member", "f",
+        )
+    
+    @_safe("liking pick")
     async def like_pick(self, pick_id: str, member_id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": pick_id, "likeCount": 1}
@@ -270,16 +831,13 @@ class GraphQLClient:
           updatePick(where: { id: $id }, data: { like: { connect: { id: $memberId } } }) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": pick_id, "memberId": member_id})
-            data = result.get("data", {}).get("updatePick")
-            if data:
-                return {"id": data.get("id"), "likeCount": 0}
-            return None
-        except Exception as e:
-            print(f"Error liking pick: {e}")
-            return None
+        result = await self.mutation(mutation, {"id": pick_id, "memberId": member_id})
+        data = _pluck(result, "data", "updatePick")
+        if data:
+            return {"id": data.get("id"), "likeCount": 0}
+        return None
     
+    @_safe("liking comment")
     async def like_comment(self, comment_id: str, member_id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": comment_id, "likeCount": 1}
@@ -290,16 +848,13 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": comment_id, "memberId": member_id})
-            data = result.get("data", {}).get("updateComment")
-            if data:
-                return {"id": data.get("id"), "likeCount": 0}
-            return None
-        except Exception as e:
-            print(f"Error liking comment: {e}")
-            return None
+        result = await self.mutation(mutation, {"id": comment_id, "memberId": member_id})
+        data = _pluck(result, "data", "updateComment")
+        if data:
+            return {"id": data.get("id"), "likeCount": 0}
+        return None
     
+    @_safe("following member")
     async def follow_member(self, follower_id: str, following_id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": f"{follower_id}->{following_id}"}
@@ -311,13 +866,10 @@ class GraphQLClient:
             ) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"followerId": follower_id, "followingId": following_id})
-            return result.get("data", {}).get("updateMember")
-        except Exception as e:
-            print(f"Error following member: {e}")
-            return None
+        result = await self.mutation(mutation, {"followerId": follower_id, "followingId": following_id})
+        return _pluck(result, "data", "updateMember")
 
+    @_safe("fetching member picks", default=list)
     async def get_member_picks(self, member_id: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return []
@@ -337,13 +889,40 @@ class GraphQLClient:
           }
         }
         """
-        try:
-            result = await self.query(query, {"memberId": member_id, "take": limit, "skip": offset})
-            return result.get("data", {}).get("Picks", [])
-        except Exception as e:
-            print(f"Error fetching member picks: {e}")
-            return []
+        result = await self.query(query, {"memberId": member_id, "take": min(limit, MAX_LIST_TAKE), "skip": offset})
+        return _pluck(result, "data", "Picks", default=[])
+
+    @_safe("fetching member with picks", default=lambda: (None, []))
+    async def get_member_with_picks(
+        self, member_id: str, limit: int = 20, offset: int = 0
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """以單一 GraphQL 文件同時取得 Member 與其 Picks（取代 get_member + get_member_picks 兩次往返）"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return await self.get_member(member_id), await self.get_member_picks(member_id, limit, offset)
+        query = """
+        query MemberWithPicks($memberId: ID!, $take: Int!, $skip: Int!) {
+          Member(where: { id: $memberId }) {
+            id name nickname email avatar intro is_active verified language
+          }
+          Picks(
+            where: { member: { id: { equals: $memberId } } },
+            take: $take,
+            skip: $skip,
+            orderBy: { picked_date: desc }
+          ) {
+            id
+            objective
+            kind
+            picked_date
+            story { id title url }
+          }
+        }
+        """
+        result = await self.query(query, {"memberId": member_id, "take": min(limit, MAX_LIST_TAKE), "skip": offset})
+        data = result.get("data") or {}
+        return data.get("Member"), data.get("Picks") or []
 
+    @_safe("fetching pick comments", default=list)
     async def get_pick_comments(self, pick_id: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return []
@@ -363,14 +942,11 @@ class GraphQLClient:
           }
         }
         """
-        try:
-            result = await self.query(query, {"pickId": pick_id, "take": limit, "skip": offset})
-            return result.get("data", {}).get("Comments", [])
-        except Exception as e:
-            print(f"Error fetching pick comments: {e}")
-            return []
+        result = await self.query(query, {"pickId": pick_id, "take": min(limit, MAX_LIST_TAKE), "skip": offset})
+        return _pluck(result, "data", "Comments", default=[])
 
     # Federation GraphQL APIs
+    @_safe("listing instances", default=list)
     async def list_federation_instances(self, limit: int = 100, offset: int = 0, approved_only: bool = False, active_only: bool = True) -> List[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return []
@@ -388,13 +964,18 @@ class GraphQLClient:
           }
         }
         """
-        try:
-            result = await self.query(query, {"take": limit, "skip": offset, "where": where or None})
-            return result.get("data", {}).get("FederationInstances", [])
-        except Exception as e:
-            print(f"Error listing instances: {e}")
-            return []
+        # 內部統計與核准清單會要求上千筆，改以每頁 MAX_LIST_TAKE 筆分頁取回
+        items: List[Dict[str, Any]] = []
+        while len(items) < limit:
+            take = min(limit - len(items), MAX_LIST_TAKE)
+            result = await self.query(query, {"take": take, "skip": offset + len(items), "where": where or None})
+            page = _pluck(result, "data", "FederationInstances", default=[])
+            items.extend(page)
+            if len(page) < take:
+                break
+        return items
 
+    @_safe("getting instance")
     async def get_federation_instance(self, domain: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return None
@@ -407,14 +988,11 @@ class GraphQLClient:
           }
         }
         """
-        try:
-            result = await self.query(query, {"domain": domain})
-            items = result.get("data", {}).get("FederationInstances", [])
-            return items[0] if items else None
-        except Exception as e:
-            print(f"Error getting instance: {e}")
-            return None
+        result = await self.query(query, {"domain": domain})
+        items = _pluck(result, "data", "FederationInstances", default=[])
+        return items[0] if items else None
 
+    @_safe("creating instance")
     async def create_federation_instance(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": "mock-instance-id"}
@@ -423,13 +1001,10 @@ class GraphQLClient:
           createFederationInstance(data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createFederationInstance")
-        except Exception as e:
-            print(f"Error creating instance: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createFederationInstance")
 
+    @_safe("updating instance")
     async def update_federation_instance(self, id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": id}
@@ -438,13 +1013,10 @@ class GraphQLClient:
           updateFederationInstance(where: { id: $id }, data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": id, "data": data})
-            return result.get("data", {}).get("updateFederationInstance")
-        except Exception as e:
-            print(f"Error updating instance: {e}")
-            return None
+        result = await self.mutation(mutation, {"id": id, "data": data})
+        return _pluck(result, "data", "updateFederationInstance")
 
+    @_safe("deleting instance", default=False)
     async def delete_federation_instance(self, id: str) -> bool:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return True
@@ -453,12 +1025,8 @@ class GraphQLClient:
           deleteFederationInstance(where: { id: $id }) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": id})
-            return bool(result.get("data", {}).get("deleteFederationInstance"))
-        except Exception as e:
-            print(f"Error deleting instance: {e}")
-            return False
+        result = await self.mutation(mutation, {"id": id})
+        return bool(_pluck(result, "data", "deleteFederationInstance"))
 
     async def update_federation_instance_by_domain(self, domain: str, data: Dict[str, Any]) -> bool:
         instance = await self.get_federation_instance(domain)
@@ -472,6 +1040,7 @@ class GraphQLClient:
             return False
         return await self.delete_federation_instance(instance.get("id"))
     
+    @_safe("updating member settings")
     async def update_member_activitypub_settings(
         self, 
         member_id: str, 
@@ -488,13 +1057,15 @@ class GraphQLClient:
                 "activitypub_public_posts": activitypub_public_posts if activitypub_public_posts is not None else True,
                 "activitypub_federation_enabled": activitypub_federation_enabled if activitypub_federation_enabled is not None else True,
             }
-        fields: Dict[str, Any] = {"activitypub_enabled": activitypub_enabled}
-        if activitypub_auto_follow is not None:
-            fields["activitypub_auto_follow"] = activitypub_auto_follow
-        if activitypub_public_posts is not None:
-            fields["activitypub_public_posts"] = activitypub_public_posts
-        if activitypub_federation_enabled is not None:
-            fields["activitypub_federation_enabled"] = activitypub_federation_enabled
+        optional = (
+            ("activitypub_auto_follow", activitypub_auto_follow),
+            ("activitypub_public_posts", activitypub_public_posts),
+            ("activitypub_federation_enabled", activitypub_federation_enabled),
+        )
+        fields: Dict[str, Any] = {
+            "activitypub_enabled": activitypub_enabled,
+            **{key: value for key, value in optional if value is not None},
+        }
         mutation = """
         mutation UpdateMemberAP($id: ID!, $data: MemberUpdateInput!) {
           updateMember(where: { id: $id }, data: $data) {
@@ -506,13 +1077,11 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": member_id, "data": fields})
-            return result.get("data", {}).get("updateMember")
-        except Exception as e:
-            print(f"Error updating member settings: {e}")
-            return None
+        result = await self.mutation(mutation, {"id": member_id, "data": fields})
+        await self.invalidate(f"member:{member_id}")
+        return _pluck(result, "data", "updateMember")
     
+    @_safe("linking comment to pick", default=False)
     async def add_comment_to_pick(self, pick_id: str, comment_id: str) -> bool:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return True
@@ -524,13 +1093,10 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"pickId": pick_id, "commentId": comment_id})
-            return bool(result.get("data", {}).get("updatePick"))
-        except Exception as e:
-            print(f"Error linking comment to pick: {e}")
-            return False
+        result = await self.mutation(mutation, {"pickId": pick_id, "commentId": comment_id})
+        return bool(_pluck(result, "data", "updatePick"))
     
+    @_safe("creating activity")
     async def create_activity(self, activity_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """在 Keystone 的 Activity list 建立記錄"""
         if getattr(settings, "GRAPHQL_MOCK", False):
@@ -540,13 +1106,16 @@ class GraphQLClient:
           createActivity(data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": activity_data})
-            return result.get("data", {}).get("createActivity")
-        except Exception as e:
-            print(f"Error creating activity: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": activity_data})
+        return _pluck(result, "data", "createActivity")
+    
+    async def create_activities_bulk(self, items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """以別名（a0, a1, ...）將多筆 createActivity 合併成單一請求，回傳順序與 items 相同"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return [{"id": item.get("activity_id", "mock-activity-id")} for item in items]
+        return await self._bulk_create(items, "CreateActivities", "createActivity", "ActivityCreateInput", "a")
     
+    @_safe("fetching activity by activity_id")
     async def get_activity_by_activity_id(self, activity_id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return None
@@ -555,15 +1124,26 @@ class GraphQLClient:
           Activities(where: { activity_id: { equals: $id } }, take: 1) { id activity_id }
         }
         """
-        try:
-            result = await self.query(query, {"id": activity_id})
-            items = result.get("data", {}).get("Activities", [])
-            return items[0] if items else None
-        except Exception as e:
-            print(f"Error fetching activity by activity_id: {e}")
+        result = await self.query(query, {"id": activity_id})
+        items = _pluck(result, "data", "Activities", default=[])
+        return items[0] if items else None
+
+    @_safe("fetching activity target by activity_id")
+    async def get_activity_target(self, activity_id: str) -> Optional[Dict[str, Any]]:
+        """取得 Like / 回覆目標的 Activity 記錄，object_data 含同步時記下的 mesh_pick_id / mesh_comment_id"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
             return None
+        query = """
+        query GetActivityTarget($id: String!) {
+          Activities(where: { activity_id: { equals: $id } }, take: 1) { id activity_id object_data }
+        }
+        """
+        result = await self.query(query, {"id": activity_id})
+        items = _pluck(result, "data", "Activities", default=[])
+        return items[0] if items else None
 
     # --- Account Discovery / Mapping / SyncTask ---
+    @_safe("creating account discovery")
     async def create_account_discovery(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {
@@ -587,13 +1167,10 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createAccountDiscovery")
-        except Exception as e:
-            print(f"Error creating account discovery: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createAccountDiscovery")
 
+    @_safe("listing account discoveries", default=list)
     async def list_account_discoveries(self, member_id: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return []
@@ -609,13 +1186,10 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.query(query, {"memberId": member_id, "take": limit, "skip": offset})
-            return result.get("data", {}).get("AccountDiscoveries", [])
-        except Exception as e:
-            print(f"Error listing account discoveries: {e}")
-            return []
+        result = await self.query(query, {"memberId": member_id, "take": min(limit, MAX_LIST_TAKE), "skip": offset})
+        return _pluck(result, "data", "AccountDiscoveries", default=[])
     
+    @_safe("getting account mapping by member and remote actor")
     async def get_account_mapping_by_member_and_remote_actor(self, member_id: str, remote_actor_id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return None
@@ -634,14 +1208,11 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.query(query, {"memberId": member_id, "remoteActor": remote_actor_id})
-            items = result.get("data", {}).get("AccountMappings", [])
-            return items[0] if items else None
-        except Exception as e:
-            print(f"Error getting account mapping by member and remote actor: {e}")
-            return None
+        result = await self.query(query, {"memberId": member_id, "remoteActor": remote_actor_id})
+        items = _pluck(result, "data", "AccountMappings", default=[])
+        return items[0] if items else None
     
+    @_safe("creating account mapping")
     async def create_account_mapping(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": "mock-mapping-id", **data}
@@ -650,13 +1221,10 @@ class GraphQLClient:
           createAccountMapping(data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createAccountMapping")
-        except Exception as e:
-            print(f"Error creating account mapping: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createAccountMapping")
     
+    @_safe("fetching account mappings", default=list)
     async def get_account_mappings(self, member_id: str) -> List[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return []
@@ -667,13 +1235,10 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.query(query, {"memberId": member_id})
-            return result.get("data", {}).get("AccountMappings", [])
-        except Exception as e:
-            print(f"Error fetching account mappings: {e}")
-            return []
+        result = await self.query(query, {"memberId": member_id})
+        return _pluck(result, "data", "AccountMappings", default=[])
     
+    @_safe("getting account mapping")
     async def get_account_mapping_by_id(self, id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": id, "mesh_member": {"id": "mock-member"}}
@@ -684,13 +1249,10 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.query(query, {"id": id})
-            return result.get("data", {}).get("AccountMapping")
-        except Exception as e:
-            print(f"Error getting account mapping: {e}")
-            return None
+        result = await self.query(query, {"id": id}, cache_tag=f"mapping:{id}")
+        return _pluck(result, "data", "AccountMapping")
     
+    @_safe("updating account mapping")
     async def update_account_mapping(self, id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": id, **data}
@@ -701,13 +1263,11 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": id, "data": data})
-            return result.get("data", {}).get("updateAccountMapping")
-        except Exception as e:
-            print(f"Error updating account mapping: {e}")
-            return None
+        result = await self.mutation(mutation, {"id": id, "data": data})
+        await self.invalidate(f"mapping:{id}")
+        return _pluck(result, "data", "updateAccountMapping")
     
+    @_safe("deleting account mapping", default=False)
     async def delete_account_mapping(self, id: str) -> bool:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return True
@@ -716,13 +1276,11 @@ class GraphQLClient:
           deleteAccountMapping(where: { id: $id }) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": id})
-            return bool(result.get("data", {}).get("deleteAccountMapping"))
-        except Exception as e:
-            print(f"Error deleting account mapping: {e}")
-            return False
+        result = await self.mutation(mutation, {"id": id})
+        await self.invalidate(f"mapping:{id}")
+        return bool(_pluck(result, "data", "deleteAccountMapping"))
 
+    @_safe("creating sync task")
     async def create_account_sync_task(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": "mock-sync-task-id", **data, "status": data.get("status", "pending"), "progress": 0}
@@ -731,13 +1289,10 @@ class GraphQLClient:
           createAccountSyncTask(data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createAccountSyncTask")
-        except Exception as e:
-            print(f"Error creating sync task: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createAccountSyncTask")
     
+    @_safe("updating sync task")
     async def update_account_sync_task(self, id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": id, **data}
@@ -746,13 +1301,10 @@ class GraphQLClient:
           updateAccountSyncTask(where: { id: $id }, data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": id, "data": data})
-            return result.get("data", {}).get("updateAccountSyncTask")
-        except Exception as e:
-            print(f"Error updating sync task: {e}")
-            return None
+        result = await self.mutation(mutation, {"id": id, "data": data})
+        return _pluck(result, "data", "updateAccountSyncTask")
 
+    @_safe("listing sync tasks", default=list)
     async def list_account_sync_tasks(self, mapping_id: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return []
@@ -768,13 +1320,10 @@ class GraphQLClient:
             }
         }
         """
-        try:
-            result = await self.query(query, {"mappingId": mapping_id, "take": limit, "skip": offset})
-            return result.get("data", {}).get("AccountSyncTasks", [])
-        except Exception as e:
-            print(f"Error listing sync tasks: {e}")
-            return []
+        result = await self.query(query, {"mappingId": mapping_id, "take": min(limit, MAX_LIST_TAKE), "skip": offset})
+        return _pluck(result, "data", "AccountSyncTasks", default=[])
 
+    @_safe("getting sync task")
     async def get_account_sync_task(self, id: str) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": id, "status": "pending", "progress": 0}
@@ -785,13 +1334,10 @@ class GraphQLClient:
           }
         }
         """
-        try:
-            result = await self.query(query, {"id": id})
-            return result.get("data", {}).get("AccountSyncTask")
-        except Exception as e:
-            print(f"Error getting sync task: {e}")
-            return None
+        result = await self.query(query, {"id": id})
+        return _pluck(result, "data", "AccountSyncTask")
     
+    @_safe("creating inbox item")
     async def create_inbox_item(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": data.get("activity_id", "mock-inbox-id")}
@@ -800,13 +1346,25 @@ class GraphQLClient:
           createInboxItem(data: $data) { id }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createInboxItem")
-        except Exception as e:
-            print(f"Error creating inbox item: {e}")
-            return None
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createInboxItem")
+    
+    async def create_inbox_items_bulk(self, items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """以別名（i0, i1, ...）將多筆 createInboxItem 合併成單一請求，回傳順序與 items 相同"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return [{"id": item.get("activity_id", "mock-inbox-id")} for item in items]
+        return await self._bulk_create(items, "CreateInboxItems", "createInboxItem", "InboxItemCreateInput", "i")
+    
+    async def mark_inbox_items_processed_bulk(self, items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """合併多筆 InboxItem 標記為已處理（items 含 id），供 MutationBatcher 使用"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return [{"id": item["id"]} for item in items]
+        return await self._bulk_update(
+            [(item["id"], {"is_processed": True}) for item in items],
+            "MarkInboxItemsProcessed", "updateInboxItem", "InboxItem", "p",
+        )
     
+    @_safe("updating inbox item")
     async def update_inbox_item_processed(self, id: str, is_processed: bool) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": id, "is_processed": is_processed}
@@ -815,13 +1373,56 @@ class GraphQLClient:
           updateInboxItem(where: { id: $id }, data: $data) { id is_processed }
         }
         """
-        try:
-            result = await self.mutation(mutation, {"id": id, "data": {"is_processed": is_processed}})
-            return result.get("data", {}).get("updateInboxItem")
-        except Exception as e:
-            print(f"Error updating inbox item: {e}")
-            return None
+        result = await self.mutation(mutation, {"id": id, "data": {"is_processed": is_processed}})
+        return _pluck(result, "data", "updateInboxItem")
     
+    @_safe("counting outbox items", default=0)
+    async def count_outbox_items(self, actor_id: str) -> int:
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return 0
+        query = """
+        query CountOutbox($actorId: String!) {
+          outboxItemsCount(where: { actor_id: { equals: $actorId } })
+        }
+        """
+        result = await self.query(query, {"actorId": actor_id})
+        return _pluck(result, "data", "outboxItemsCount") or 0
+
+    @_safe("listing outbox items", default=list)
+    async def list_outbox_items(
+        self, actor_id: str, limit: int = 20, before: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """以 (created_at, id) 做 keyset 分頁，依新到舊取得 actor 的 OutboxItem
+
+        before 為上一頁最後一筆的 (created_at, id)；為 None 時取第一頁。
+        """
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return []
+        where: Dict[str, Any] = {"actor_id": {"equals": actor_id}}
+        if before is not None:
+            created_at, item_id = before
+            where = {
+                "AND": [
+                    where,
+                    {
+                        "OR": [
+                            {"created_at": {"lt": created_at}},
+                            {"AND": [{"created_at": {"equals": created_at}}, {"id": {"lt": item_id}}]},
+                        ]
+                    },
+                ]
+            }
+        query = """
+        query ListOutbox($where: OutboxItemWhereInput!, $take: Int!) {
+          OutboxItems(where: $where, take: $take, orderBy: [{ created_at: desc }, { id: desc }]) {
+            id activity_data created_at
+          }
+        }
+        """
+        result = await self.query(query, {"where": where, "take": limit})
+        return _pluck(result, "data", "OutboxItems", default=[])
+
+    @_safe("creating outbox item")
     async def create_outbox_item(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if getattr(settings, "GRAPHQL_MOCK", False):
             return {"id": data.get("activity_id", "mock-outbox-id")}
@@ -830,9 +1431,149 @@ class GraphQLClient:
           createOutboxItem(data: $data) { id }
         }
         """
+        result = await self.mutation(mutation, {"data": data})
+        return _pluck(result, "data", "createOutboxItem")
+    
+    @_safe("creating activity with outbox item", default=(None, None))
+    async def create_activity_with_outbox(
+        self, activity_data: Dict[str, Any], outbox_data: Dict[str, Any]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """以單一 mutation 同時建立 Activity 與 OutboxItem，回傳 (activity, outbox_item)"""
+        if getattr(settings, "GRAPHQL_MOCK", False):
+            return (
+                {"id": activity_data.get("activity_id", "mock-activity-id")},
+                {"id": outbox_data.get("activity_id", "mock-outbox-id")},
+            )
+        mutation = """
+        mutation CreateActivityWithOutbox($a: ActivityCreateInput!, $b: OutboxItemCreateInput!) {
+          activity: createActivity(data: $a) { id }
+          outbox: createOutboxItem(data: $b) { id }
+        }
+        """
+        result = await self.mutation(mutation, {"a": activity_data, "b": outbox_data})
+        data = result.get("data") or {}
+        return data.get("activity"), data.get("outbox")
+
+
+@functools.lru_cache(maxsize=1)
+def get_graphql_client() -> GraphQLClient:
+    """取得全程序共用的 GraphQLClient（透過 shared_client 共用連線池）"""
+    return GraphQLClient()
+
+_keepalive_task: Optional[asyncio.Task] = None
+
+async def _keepalive_loop(interval: int) -> None:
+    client = get_graphql_client()
+    while True:
+        await client.ping()
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
+
+def start_keepalive() -> None:
+    """啟動時於背景預熱連線，之後每 GQL_KEEPALIVE_INTERVAL 秒送出一次 ping 維持連線（0 表示只預熱）"""
+    global _keepalive_task
+    if _keepalive_task is None:
+        _keepalive_task = asyncio.create_task(_keepalive_loop(settings.GQL_KEEPALIVE_INTERVAL))
+
+async def stop_keepalive() -> None:
+    global _keepalive_task
+    task, _keepalive_task = _keepalive_task, None
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+class MutationBatcher:
+    """將短時間內送出的多筆同類 mutation 合併後交給 bulk 函式一次送出
+
+    累積到 max_size 筆或距第一筆超過 max_delay 秒（預設 50 筆 / GQL_BATCH_WINDOW_MS）即送出；
+    每個 submit() 取得與自己輸入對應的那一筆結果。max_delay 為 0 時不合併，逐筆直接送出。
+    不需要結果的寫入可用 enqueue()：排入後立即返回，失敗只記錄 log（at-most-once），
+    應用關閉時以 drain() 等待送出完畢。
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Dict[str, Any]]], Awaitable[List[Optional[Dict[str, Any]]]]],
+        max_size: int = MAX_BULK_MUTATIONS,
+        max_delay: Optional[float] = None,
+    ):
+        self._flush = flush
+        self.max_size = max_size
+        self.max_delay = settings.GQL_BATCH_WINDOW_MS / 1000 if max_delay is None else max_delay
+        self._pending: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 送出中的批次（drain() 等待、enqueue() 的背壓依據）
+        self._running: set = set()
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # 事件迴圈更換（例如測試中多次 asyncio.run）時丟棄舊狀態
+            self._loop, self._pending, self._timer, self._running = loop, [], None, set()
+        return loop
+
+    def _add(self, item: Dict[str, Any], future: Optional[asyncio.Future]) -> None:
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size or self.max_delay <= 0:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self.max_delay, self._flush_now)
+
+    async def submit(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self.max_delay <= 0:
+            result = (await self._flush([item]))[0]
+            if isinstance(result, BaseException):
+                raise result
+            return result
+        future = self._bind_loop().create_future()
+        self._add(item, future)
+        return await future
+
+    async def enqueue(self, item: Dict[str, Any]) -> None:
+        """排入批次後立即返回，不等待寫入結果；送出中的批次過多時先等待其中一批完成（背壓）"""
+        self._bind_loop()
+        while len(self._running) >= MAX_PENDING_FLUSHES:
+            await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+        self._add(item, None)
+
+    async def drain(self) -> None:
+        """送出尚在等待的項目並等待所有批次完成"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        self._flush_now()
+        while self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]) -> None:
         try:
-            result = await self.mutation(mutation, {"data": data})
-            return result.get("data", {}).get("createOutboxItem")
+            results = await self._flush([item for item, _ in batch])
         except Exception as e:
-            print(f"Error creating outbox item: {e}")
-            return None
+            if any(future is None for _, future in batch):
+                logger.exception("Error flushing queued mutations")
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        # flush 可針對個別項目回傳例外物件（例如合併查詢改逐筆重送後其中一筆失敗），只交給該筆的呼叫者
+        for (_, future), result in zip(batch, results):
+            if future is None:
+                if isinstance(result, BaseException):
+                    logger.error("Error flushing queued mutation: %s", result)
+            elif not future.done():
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -1,3 +1,9 @@
+import gc
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
@@ -8,8 +14,11 @@ from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.activitypub import users_router, well_known_router
 # 完全改用 GraphQL，不依賴本地資料庫
-from app.core.graphql_client import GraphQLClient
-import httpx
+from app.core.graphql_client import GraphQLClient, create_http_client, start_keepalive, stop_keepalive
+from app.core.activitypub.federation import close_federation_client
+from app.core.activitypub.processor import start_inbox_workers, stop_inbox_workers
+from app.core.activitypub.mesh_sync import mesh_sync_manager
+from app.core.activitypub.utils import shutdown_key_pool
 
 app = FastAPI(
     title="READr Mesh ActivityPub Server",
@@ -40,27 +49,63 @@ app.include_router(well_known_router, prefix="/.well-known", tags=["activitypub"
 # 其餘 ActivityPub 端點掛在根目錄
 app.include_router(users_router, tags=["activitypub"])
 
+# 日誌經由佇列交給背景執行緒輸出，避免 stdout I/O 阻塞事件迴圈
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+def _start_log_queue():
+    global _log_listener
+    if _log_listener is not None:
+        return
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    # 只替換 handler，不更動 root logger 的層級
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+
+def _stop_log_queue():
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+def _tune_gc():
+    """依設定放寬 gen0 門檻、將啟動時已載入的物件移出 GC 追蹤（皆預設關閉）
+
+    非同步請求會產生大量短命的 coroutine/Future，預設門檻（700）下 gen0 回收可能過於頻繁；
+    代價是兩次回收間可累積較多循環參照物件，記憶體峰值上升。
+    """
+    if settings.GC_GEN0_THRESHOLD > 0:
+        _, gen1, gen2 = gc.get_threshold()
+        gc.set_threshold(settings.GC_GEN0_THRESHOLD, gen1, gen2)
+    if settings.GC_FREEZE_ON_STARTUP:
+        gc.freeze()
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize resources on application startup"""
+    _start_log_queue()
+    _tune_gc()
     # 完全改用 GraphQL，不初始化本地資料庫
     # 建立共享 httpx AsyncClient（HTTP/2、連線池、逾時）
-    GraphQLClient.set_shared_client(
-        httpx.AsyncClient(
-            http2=True,
-            timeout=httpx.Timeout(10.0, read=20.0),
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
-            headers={"User-Agent": "readr-mesh-ap/1.0"},
-        )
-    )
+    GraphQLClient.set_shared_client(create_http_client())
+    # 背景預熱 GraphQL 連線，不阻塞啟動
+    start_keepalive()
+    # 收件匣背景處理 worker
+    start_inbox_workers()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup resources on application shutdown"""
-    client = GraphQLClient.shared_client
-    if client is not None:
-        await client.aclose()
-    GraphQLClient.set_shared_client(None)
+    # 先處理完佇列中的投遞，再關閉共用 client
+    await stop_inbox_workers()
+    await mesh_sync_manager.drain()
+    await stop_keepalive()
+    await GraphQLClient.close_shared_client()
+    await close_federation_client()
+    shutdown_key_pool()
+    _stop_log_queue()
 
 @app.get("/")
 async def root():
@@ -74,5 +119,7 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        # uvicorn[standard] 已附帶 uvloop；明確指定，缺少時啟動即失敗而非默默退回 asyncio
+        loop="uvloop",
     )
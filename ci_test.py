@@ -125,11 +125,10 @@ class CITester:
             headers={"Accept": "application/activity+json"}
         ))
         
-        # WebFinger (預期失敗)
+        # WebFinger
         results.append(await self.test_endpoint_with_retry(
             "GET", 
-            f"{self.base_url}/.well-known/webfinger?resource=acct:test@activity.readr.tw",
-            expected_status=404
+            f"{self.base_url}/.well-known/webfinger?resource=acct:test@activity.readr.tw"
         ))
         
         # Inbox 測試
@@ -143,7 +142,8 @@ class CITester:
             "POST",
             f"{self.base_url}/.well-known/inbox/test/inbox",
             data=inbox_data,
-            headers={"Content-Type": "application/activity+json"}
+            headers={"Content-Type": "application/activity+json"},
+            expected_status=202
         ))
         
         return results
@@ -192,7 +192,7 @@ class CITester:
         print("\n🔍 測試 Mesh 整合...")
         results = []
         
-        # 創建 pick (預期失敗，因為缺少必要資料)
+        # 創建 pick（mock 模式下以測試 Actor 建立成功）
         pick_data = {
             "story_id": "test-story",
             "comment": "Great story!"
@@ -201,7 +201,7 @@ class CITester:
             "POST",
             f"{self.base_url}/api/v1/mesh/picks?member_id=test",
             data=pick_data,
-            expected_status=500  # 預期內部錯誤
+            expected_status=200
         ))
         
         return results
@@ -111,11 +111,10 @@ class ActivityPubTester:
             headers={"Accept": "application/activity+json"}
         ))
         
-        # WebFinger (會失敗，因為域名不匹配)
+        # WebFinger
         results.append(await self.test_endpoint(
             "GET", 
-            f"{self.base_url}/.well-known/webfinger?resource=acct:test@activity.readr.tw",
-            expected_status=404  # 預期失敗
+            f"{self.base_url}/.well-known/webfinger?resource=acct:test@activity.readr.tw"
         ))
         
         # Inbox
@@ -128,7 +127,8 @@ class ActivityPubTester:
             "POST",
             f"{self.base_url}/.well-known/inbox/test/inbox",
             data=activity_data,
-            headers={"Content-Type": "application/activity+json"}
+            headers={"Content-Type": "application/activity+json"},
+            expected_status=202
         ))
         
         return results
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+GraphQLClient 內部機制的單元測試（不需啟動服務或連線後端）
+
+可直接執行，或以 pytest 收集：
+    python test_graphql_client.py
+    python -m pytest -q test_graphql_client.py
+"""
+
+import asyncio
+import contextlib
+
+import httpx
+
+from app.core import graphql_client as graphql_client_module
+from app.core.graphql_client import (
+    GraphQLClient,
+    MAX_BULK_MUTATIONS,
+    MAX_LIST_TAKE,
+    MutationBatcher,
+    _safe,
+    _merge_queries,
+    _query_prefix,
+    _merged_failed,
+    _prefix_root_fields,
+    _split_merged_result,
+)
+
+
+# --- 合併查詢改寫 ---
+
+def test_prefix_root_fields_adds_aliases_only_at_top_level():
+    body, aliases = _prefix_root_fields(' Member(where: { id: $id }) { id name } ', "q0_")
+    assert body == ' q0_Member: Member(where: { id: $id }) { id name } '
+    assert aliases == {"q0_Member": "Member"}
+
+
+def test_prefix_root_fields_rewrites_existing_alias():
+    body, aliases = _prefix_root_fields(" me: Member { id } other: Story { id }", "q1_")
+    assert body == " q1_me: Member { id } q1_other: Story { id }"
+    assert aliases == {"q1_me": "me", "q1_other": "other"}
+
+
+def test_prefix_root_fields_skips_string_literals():
+    body, aliases = _prefix_root_fields(' Stories(where: { url: { equals: "a{b} \\"c" } }) { id }', "q0_")
+    assert body == ' q0_Stories: Stories(where: { url: { equals: "a{b} \\"c" } }) { id }'
+    assert aliases == {"q0_Stories": "Stories"}
+
+
+def test_merge_queries_prefixes_variables_and_fields():
+    merged, alias_maps = _merge_queries([
+        {"query": "query A($id: ID!) { Member(where: { id: $id }) { id } }", "variables": {"id": "1"}},
+        {"query": "{ Stories { id } }", "variables": {}},
+    ])
+    assert merged["query"].startswith("query MergedQuery($q0_id: ID!) {")
+    assert "q0_Member: Member(where: { id: $q0_id })" in merged["query"]
+    assert "q1_Stories: Stories" in merged["query"]
+    assert merged["variables"] == {"q0_id": "1"}
+    assert alias_maps == [{"q0_Member": "Member"}, {"q1_Stories": "Stories"}]
+
+
+def test_split_merged_result_assigns_errors_by_path():
+    alias_maps = [{f"q{i}_Story": "Story"} for i in range(11)]
+    data = {f"q{i}_Story": {"id": str(i)} for i in range(11)}
+    data["q1_Story"] = None
+    error = {"message": "not found", "path": ["q1_Story"]}
+    results = _split_merged_result({"data": data, "errors": [error]}, alias_maps)
+    assert results[0] == {"data": {"Story": {"id": "0"}}}
+    assert results[1] == {"data": {"Story": None}, "errors": [error]}
+    # q10_ 不應被當成 q1_ 的錯誤
+    assert "errors" not in results[10]
+
+
+def test_merged_failed_detects_document_level_errors():
+    assert _merged_failed(ValueError("400"))
+    assert _merged_failed({"data": None, "errors": [{"message": "boom"}]})
+    assert _merged_failed({"data": {"q0_Story": None}, "errors": [{"message": "validation"}]})
+    assert not _merged_failed({"data": {"q0_Story": None}, "errors": [{"message": "x", "path": ["q0_Story"]}]})
+    assert not _merged_failed({"data": {"q0_Story": {"id": "1"}}})
+
+
+def test_post_batch_retries_members_individually_on_document_failure():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+    sent = []
+
+    async def fake_post(payload, persisted=True):
+        sent.append(payload["query"])
+        if payload["query"].startswith("query MergedQuery"):
+            return {"data": None, "errors": [{"message": "Cannot query field bad"}]}
+        if "bad" in payload["query"]:
+            raise ValueError("400 Bad Request")
+        return {"data": {"Story": {"id": payload["variables"]["id"]}}}
+
+    client._post = fake_post
+    payloads = [
+        {"query": "query S($id: ID!) { Story(where: { id: $id }) { id } }", "variables": {"id": "1"}},
+        {"query": "query B($id: ID!) { bad(where: { id: $id }) { id } }", "variables": {"id": "2"}},
+        {"query": "query S($id: ID!) { Story(where: { id: $id }) { id } }", "variables": {"id": "3"}},
+    ]
+    results = asyncio.run(client._post_batch(payloads))
+    assert results[0] == {"data": {"Story": {"id": "1"}}}
+    assert isinstance(results[1], ValueError)
+    assert results[2] == {"data": {"Story": {"id": "3"}}}
+    # 合併文件一次，失敗後逐筆重送三次
+    assert len(sent) == 4
+
+
+def test_merged_documents_bypass_query_prefix_cache():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+    bodies = []
+
+    async def fake_post_body(body, allow_error_status=False):
+        bodies.append(body)
+        return {"data": {}}
+
+    client._post_body = fake_post_body
+    _query_prefix.cache_clear()
+    asyncio.run(client._post({"query": "query MergedQuery { q0_Story: Story { id } }", "variables": {}}, persisted=False))
+    assert _query_prefix.cache_info().currsize == 0
+    assert bodies == [b'{"query":"query MergedQuery { q0_Story: Story { id } }","variables":{}}']
+
+
+@contextlib.contextmanager
+def live_mode(**overrides):
+    """暫時關閉 GRAPHQL_MOCK（settings 為 frozen，改以複本替換模組內的 settings）"""
+    original = graphql_client_module.settings
+    graphql_client_module.settings = original.model_copy(update={"GRAPHQL_MOCK": False, **overrides})
+    try:
+        yield
+    finally:
+        graphql_client_module.settings = original
+
+
+# --- MutationBatcher ---
+
+def test_batcher_flushes_when_full_without_waiting_for_window():
+    calls = []
+
+    async def flush(items):
+        calls.append(list(items))
+        return [{"id": item["n"]} for item in items]
+
+    async def run():
+        batcher = MutationBatcher(flush, max_size=3, max_delay=60)
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit({"n": n}) for n in range(3))), 1)
+
+    assert asyncio.run(run()) == [{"id": 0}, {"id": 1}, {"id": 2}]
+    assert calls == [[{"n": 0}, {"n": 1}, {"n": 2}]]
+
+
+def test_batcher_flushes_after_window():
+    calls = []
+
+    async def flush(items):
+        calls.append(len(items))
+        return [{"id": item["n"]} for item in items]
+
+    async def run():
+        batcher = MutationBatcher(flush, max_size=50, max_delay=0.01)
+        results = await asyncio.gather(batcher.submit({"n": 1}), batcher.submit({"n": 2}))
+        await batcher.enqueue({"n": 3})
+        await batcher.drain()
+        return results
+
+    assert asyncio.run(run()) == [{"id": 1}, {"id": 2}]
+    assert calls == [2, 1]
+
+
+def test_batcher_maps_per_item_exceptions_to_their_callers():
+    async def flush(items):
+        return [{"id": 1}, ValueError("second failed")]
+
+    async def run():
+        batcher = MutationBatcher(flush, max_size=2, max_delay=60)
+        return await asyncio.gather(batcher.submit({"n": 1}), batcher.submit({"n": 2}), return_exceptions=True)
+
+    first, second = asyncio.run(run())
+    assert first == {"id": 1}
+    assert isinstance(second, ValueError)
+
+
+def test_batcher_fails_every_caller_when_flush_raises():
+    async def flush(items):
+        raise httpx.ConnectError("down")
+
+    async def run():
+        batcher = MutationBatcher(flush, max_size=2, max_delay=60)
+        return await asyncio.gather(batcher.submit({"n": 1}), batcher.submit({"n": 2}), return_exceptions=True)
+
+    assert all(isinstance(result, httpx.ConnectError) for result in asyncio.run(run()))
+
+
+# --- bulk mutation ---
+
+def test_bulk_create_maps_results_by_alias():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+
+    async def fake_mutation(mutation, variables):
+        assert "a0: createActivity(data: $i0)" in mutation
+        return {"data": {"a0": {"id": "1"}, "a1": None}, "errors": [{"message": "x", "path": ["a1"]}]}
+
+    client.mutation = fake_mutation
+    results = asyncio.run(client._bulk_create([{"n": 0}, {"n": 1}], "CreateActivities", "createActivity", "ActivityCreateInput", "a"))
+    assert results == [{"id": "1"}, None]
+
+
+def test_bulk_update_fails_only_the_chunk_that_errors():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+    calls = []
+
+    async def fake_mutation(mutation, variables):
+        calls.append(variables)
+        if len(calls) == 2:
+            raise httpx.ReadTimeout("timeout")
+        return {"data": {f"l{k}": {"id": variables[f"w{k}"]} for k in range(len(variables) // 2)}}
+
+    client.mutation = fake_mutation
+    items = [(str(n), {"like": {"connect": {"id": "m"}}}) for n in range(MAX_BULK_MUTATIONS + 2)]
+    results = asyncio.run(client._bulk_update(items, "LikeComments", "updateComment", "Comment", "l"))
+    assert len(calls) == 2
+    assert results[:MAX_BULK_MUTATIONS] == [{"id": str(n)} for n in range(MAX_BULK_MUTATIONS)]
+    assert results[MAX_BULK_MUTATIONS:] == [None, None]
+
+
+# --- 查詢去重與快取 ---
+
+def test_inflight_dedup_shares_one_request_and_its_exception():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+    sent = []
+
+    async def fake_send(payload):
+        sent.append(payload)
+        await asyncio.sleep(0.01)
+        raise httpx.ConnectError("down")
+
+    client._send = fake_send
+
+    async def run():
+        results = await asyncio.gather(
+            client.query("query Q { Story { id } }"),
+            client.query("query Q { Story { id } }"),
+            return_exceptions=True,
+        )
+        # 失敗的查詢不留在進行中表，之後重新送出
+        with contextlib.suppress(httpx.ConnectError):
+            await client.query("query Q { Story { id } }")
+        return results
+
+    with live_mode():
+        results = asyncio.run(run())
+    assert all(isinstance(result, httpx.ConnectError) for result in results)
+    assert len(sent) == 2
+    assert not client._inflight
+
+
+def test_tag_invalidation_drops_cached_queries():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+    sent = []
+
+    async def fake_send(payload):
+        sent.append(payload)
+        return {"data": {"Member": {"id": payload["variables"]["id"], "n": len(sent)}}}
+
+    client._send = fake_send
+    query = "query M($id: ID!) { Member(where: { id: $id }) { id } }"
+
+    async def run():
+        first = await client.query(query, {"id": "1"}, cache_tag="member:1")
+        cached = await client.query(query, {"id": "1"}, cache_tag="member:1")
+        other = await client.query(query, {"id": "2"}, cache_tag="member:2")
+        await client.invalidate("member:1")
+        refreshed = await client.query(query, {"id": "1"}, cache_tag="member:1")
+        still_cached = await client.query(query, {"id": "2"}, cache_tag="member:2")
+        return first, cached, other, refreshed, still_cached
+
+    with live_mode(GQL_CACHE_MIN_MS=0):
+        first, cached, other, refreshed, still_cached = asyncio.run(run())
+    assert cached == first
+    assert refreshed["data"]["Member"]["n"] == 3
+    assert still_cached == other
+    assert len(sent) == 3
+
+
+def test_fast_queries_are_not_cached_by_default():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+    sent = []
+
+    async def fake_send(payload, delay):
+        sent.append(payload)
+        await asyncio.sleep(delay)
+        return {"data": {"Member": {"id": payload["variables"]["id"]}}}
+
+    query = "query M($id: ID!) { Member(where: { id: $id }) { id } }"
+
+    async def run():
+        # 未達 GQL_CACHE_MIN_MS（預設 50ms）的查詢不寫入快取，第二次仍送出
+        client._send = lambda payload: fake_send(payload, 0)
+        await client.query(query, {"id": "1"}, cache_tag="member:1")
+        await client.query(query, {"id": "1"}, cache_tag="member:1")
+        # 較慢的查詢寫入快取，第二次直接命中
+        client._send = lambda payload: fake_send(payload, 0.06)
+        await client.query(query, {"id": "2"}, cache_tag="member:2")
+        await client.query(query, {"id": "2"}, cache_tag="member:2")
+
+    with live_mode():
+        asyncio.run(run())
+    assert [payload["variables"]["id"] for payload in sent] == ["1", "1", "2"]
+
+
+# --- 清單查詢上限 ---
+
+def test_list_federation_instances_pages_by_max_list_take():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+    rows = [{"id": str(n)} for n in range(MAX_LIST_TAKE * 2 + 5)]
+    takes = []
+
+    async def fake_query(query, variables=None, **kwargs):
+        takes.append(variables["take"])
+        return {"data": {"FederationInstances": rows[variables["skip"]:variables["skip"] + variables["take"]]}}
+
+    client.query = fake_query
+    with live_mode():
+        items = asyncio.run(client.list_federation_instances(limit=1000))
+    assert items == rows
+    # 每頁至多 MAX_LIST_TAKE 筆，取回不足一頁時停止
+    assert takes == [MAX_LIST_TAKE] * 3
+
+
+def test_list_queries_clamp_take():
+    client = GraphQLClient(endpoint="http://graphql.invalid", token="t")
+    takes = []
+
+    async def fake_query(query, variables=None, **kwargs):
+        takes.append(variables["take"])
+        return {"data": {}}
+
+    client.query = fake_query
+    with live_mode():
+        asyncio.run(client.list_account_discoveries("m", limit=1000))
+        asyncio.run(client.list_account_sync_tasks("mapping", limit=1000))
+    assert takes == [MAX_LIST_TAKE, MAX_LIST_TAKE]
+
+
+# --- 錯誤處理 ---
+
+def test_safe_returns_default_only_for_backend_errors():
+    @_safe("testing", default=list)
+    async def fails_with(exc):
+        raise exc
+
+    assert asyncio.run(fails_with(httpx.ConnectError("down"))) == []
+    try:
+        asyncio.run(fails_with(KeyError("data")))
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("KeyError should propagate")
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    raise SystemExit(1 if failed else 0)
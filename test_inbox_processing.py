@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+收件匣背景處理（processor）的單元測試（不需啟動服務或連線後端）
+
+可直接執行，或以 pytest 收集：
+    python test_inbox_processing.py
+    python -m pytest -q test_inbox_processing.py
+"""
+
+import asyncio
+import contextlib
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.activitypub import inbox, processor
+from app.core.activitypub.mesh_sync import mesh_sync_manager
+
+
+@contextlib.contextmanager
+def patched(obj, **attrs):
+    """暫時替換物件屬性，離開時還原"""
+    original = {name: getattr(obj, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(obj, name, value)
+
+
+def _activity(n, activity_type="Create"):
+    return {"id": f"https://remote.example/activities/{n}", "type": activity_type, "actor": "https://remote.example/users/a"}
+
+
+# --- process_activities 結果對應 ---
+
+def test_process_activities_keeps_per_item_mesh_results():
+    async def fake_batch(activities, db=None):
+        return [False, True]
+
+    async def fake_accept(activity_data, db=None):
+        return None
+
+    activities = [_activity(0), _activity(1, "Accept"), _activity(2, "Like")]
+    with patched(mesh_sync_manager, sync_activities_batch=fake_batch), patched(processor, _HANDLERS={"Accept": fake_accept}):
+        assert asyncio.run(processor.process_activities(activities)) == [False, True, True]
+
+
+def test_process_activities_fails_mesh_items_when_batch_raises():
+    async def fake_batch(activities, db=None):
+        raise RuntimeError("prefetch failed")
+
+    async def failing_accept(activity_data, db=None):
+        raise KeyError("object")
+
+    activities = [_activity(0), _activity(1, "Accept"), _activity(2, "Follow")]
+    with patched(mesh_sync_manager, sync_activities_batch=fake_batch), patched(processor, _HANDLERS={"Accept": failing_accept}):
+        assert asyncio.run(processor.process_activities(activities)) == [False, False, False]
+
+
+def test_process_inbox_deliveries_marks_only_successful_items():
+    marked = []
+
+    async def fake_batch(activities, db=None):
+        return [activity["id"].endswith("/0") for activity in activities]
+
+    async def fake_enqueue(item):
+        marked.append(item["id"])
+
+    deliveries = [(_activity(0), "inbox-0"), (_activity(1), "inbox-1"), (_activity(2, "Announce"), None)]
+    with patched(mesh_sync_manager, sync_activities_batch=fake_batch), patched(processor._inbox_done_batcher, enqueue=fake_enqueue):
+        asyncio.run(processor.process_inbox_deliveries(deliveries))
+    assert marked == ["inbox-0"]
+
+
+def test_inbox_worker_drains_queued_deliveries_into_one_batch():
+    batches = []
+
+    async def fake_process(deliveries):
+        batches.append(list(deliveries))
+
+    async def run():
+        queue = asyncio.Queue()
+        for n in range(3):
+            queue.put_nowait((_activity(n), f"inbox-{n}"))
+        with patched(processor, process_inbox_deliveries=fake_process):
+            worker = asyncio.create_task(processor._inbox_worker(queue))
+            await queue.join()
+            worker.cancel()
+
+    asyncio.run(run())
+    assert batches == [[(_activity(n), f"inbox-{n}") for n in range(3)]]
+
+
+# --- 收件匣寫入與排入佇列 ---
+
+def test_enqueue_persists_inbox_item_before_queueing():
+    submitted = []
+
+    async def fake_submit(item):
+        submitted.append(item)
+        return {"id": "inbox-1"}
+
+    async def run():
+        queue = asyncio.Queue()
+        with patched(processor._inbox_batcher, submit=fake_submit), patched(processor, _inbox_queue=queue):
+            accepted = await processor.enqueue_inbox_delivery(_activity(0))
+        return accepted, [queue.get_nowait() for _ in range(queue.qsize())]
+
+    accepted, queued = asyncio.run(run())
+    assert accepted is True
+    assert submitted[0]["activity_id"] == _activity(0)["id"]
+    assert submitted[0]["is_processed"] is False
+    assert queued == [(_activity(0), "inbox-1")]
+
+
+def test_enqueue_does_not_queue_when_inbox_write_fails():
+    async def fake_submit(item):
+        return None
+
+    async def run():
+        queue = asyncio.Queue()
+        with patched(processor._inbox_batcher, submit=fake_submit), patched(processor, _inbox_queue=queue):
+            accepted = await processor.enqueue_inbox_delivery(_activity(0))
+        return accepted, queue.qsize()
+
+    assert asyncio.run(run()) == (False, 0)
+
+
+def _inbox_client():
+    app = FastAPI()
+    app.include_router(inbox.inbox_router, prefix="/users")
+    return TestClient(app)
+
+
+def test_inbox_route_answers_503_when_delivery_is_not_persisted():
+    async def fake_enqueue(activity_data):
+        return False
+
+    with patched(inbox, enqueue_inbox_delivery=fake_enqueue):
+        response = _inbox_client().post("/users/testuser/inbox", json=_activity(0))
+    assert response.status_code == 503
+
+
+def test_inbox_route_answers_202_once_delivery_is_persisted():
+    received = []
+
+    async def fake_enqueue(activity_data):
+        received.append(activity_data)
+        return True
+
+    with patched(inbox, enqueue_inbox_delivery=fake_enqueue):
+        response = _inbox_client().post("/users/testuser/inbox", json=_activity(0))
+    assert response.status_code == 202
+    assert received == [_activity(0)]
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    raise SystemExit(1 if failed else 0)
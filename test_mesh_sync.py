@@ -159,7 +159,7 @@ async def test_note_classification():
             object_data = activity.get("object", {})
             
             # Test classification logic
-            should_be_pick = await mesh_sync_manager._should_become_pick(object_data)
+            should_be_pick = mesh_sync_manager._should_become_pick(object_data)
             print(f"   Should become Pick: {'✅ Yes' if should_be_pick else '❌ No'}")
             
             # Test actual conversion
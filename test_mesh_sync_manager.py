@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+MeshSyncManager 同步路徑的單元測試（不需啟動服務或連線後端）
+
+可直接執行，或以 pytest 收集：
+    python test_mesh_sync_manager.py
+    python -m pytest -q test_mesh_sync_manager.py
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.core.activitypub.mesh_sync import MeshSyncManager
+from app.core.graphql_client import GraphQLClient
+
+
+def _manager(targets=None, members=None):
+    """建立以假資料取代 GraphQL 查詢的 MeshSyncManager
+
+    targets：AP object id -> Activity 記錄；members：Actor URL -> mesh member id
+    """
+    manager = MeshSyncManager()
+    targets = targets or {}
+    members = members or {}
+
+    async def get_activity_target(activity_id):
+        return targets.get(activity_id)
+
+    async def get_activity_by_activity_id(activity_id):
+        return None
+
+    async def get_or_create_actor(actor_id, db=None):
+        if actor_id not in members:
+            return None
+        return SimpleNamespace(graphql_id=f"actor:{actor_id}", mesh_member_id=members[actor_id], username=actor_id.rsplit("/", 1)[-1])
+
+    manager.graphql_client = SimpleNamespace(
+        get_activity_target=get_activity_target,
+        get_activity_by_activity_id=get_activity_by_activity_id,
+    )
+    manager._get_or_create_actor = get_or_create_actor
+    return manager
+
+
+class _Recorder:
+    """取代 MutationBatcher，記錄排入的項目"""
+
+    def __init__(self, result=None):
+        self.items = []
+        self.result = result
+
+    async def enqueue(self, item):
+        self.items.append(item)
+
+    async def submit(self, item):
+        self.items.append(item)
+        return self.result
+
+
+ACTOR = "https://remote.example/users/alice"
+COMMENT = "https://remote.example/objects/comment-1"
+PICK = "https://remote.example/objects/pick-1"
+
+
+# --- Like ---
+
+def test_comment_like_reaches_like_batcher():
+    manager = _manager(
+        targets={COMMENT: {"id": "1", "activity_id": COMMENT, "object_data": {"id": COMMENT, "mesh_comment_id": "c1"}}},
+        members={ACTOR: "m1"},
+    )
+    manager._like_batcher = _Recorder()
+    like = {"id": "https://remote.example/likes/1", "type": "Like", "actor": ACTOR, "object": COMMENT}
+    assert asyncio.run(manager._sync_like_activity(like)) is True
+    assert manager._like_batcher.items == [{"commentId": "c1", "memberId": "m1"}]
+
+
+def test_pick_like_is_accepted_without_writing():
+    manager = _manager(
+        targets={PICK: {"id": "2", "activity_id": PICK, "object_data": {"id": PICK, "mesh_pick_id": "p1"}}},
+        members={ACTOR: "m1"},
+    )
+    manager._like_batcher = _Recorder()
+    like = {"id": "https://remote.example/likes/2", "type": "Like", "actor": ACTOR, "object": PICK}
+    assert asyncio.run(manager._sync_like_activity(like)) is True
+    assert manager._like_batcher.items == []
+
+
+def test_like_without_member_or_known_target_is_not_synced():
+    manager = _manager(
+        targets={COMMENT: {"id": "1", "activity_id": COMMENT, "object_data": {"id": COMMENT, "mesh_comment_id": "c1"}}},
+        members={ACTOR: None},
+    )
+    manager._like_batcher = _Recorder()
+    unknown = {"id": "https://remote.example/likes/3", "type": "Like", "actor": ACTOR, "object": "https://remote.example/objects/other"}
+    no_member = {"id": "https://remote.example/likes/4", "type": "Like", "actor": ACTOR, "object": COMMENT}
+    assert asyncio.run(manager._sync_like_activity(unknown)) is False
+    assert asyncio.run(manager._sync_like_activity(no_member)) is False
+    assert manager._like_batcher.items == []
+
+
+# --- 回覆 ---
+
+def test_reply_to_synced_comment_sets_parent_id():
+    manager = _manager(
+        targets={COMMENT: {"id": "1", "activity_id": COMMENT, "object_data": {"id": COMMENT, "mesh_comment_id": "c1"}}},
+        members={ACTOR: "m1"},
+    )
+    manager._comment_batcher = _Recorder(result={"id": "c2"})
+    manager._activity_batcher = _Recorder()
+    reply = {
+        "id": "https://remote.example/activities/5",
+        "type": "Create",
+        "actor": ACTOR,
+        "object": {"id": "https://remote.example/objects/comment-2", "type": "Note", "content": "回覆", "inReplyTo": COMMENT},
+    }
+    assert asyncio.run(manager._sync_comment_to_mesh(reply)) is True
+    assert manager._comment_batcher.items == [{"content": "回覆", "memberId": "m1", "parentId": "c1"}]
+
+
+def test_reply_to_pick_sets_pick_id():
+    pick_url = "https://activity.readr.tw/picks/p1"
+    manager = _manager(
+        targets={pick_url: {"id": "2", "activity_id": pick_url, "object_data": {"id": pick_url, "mesh_pick_id": "p1"}}},
+        members={ACTOR: "m1"},
+    )
+    manager._comment_batcher = _Recorder(result={"id": "c3"})
+    manager._activity_batcher = _Recorder()
+    reply = {
+        "id": "https://remote.example/activities/6",
+        "type": "Create",
+        "actor": ACTOR,
+        "object": {"id": "https://remote.example/objects/comment-3", "type": "Note", "content": "好文", "inReplyTo": pick_url},
+    }
+    assert asyncio.run(manager._sync_comment_to_mesh(reply)) is True
+    assert manager._comment_batcher.items == [{"content": "好文", "memberId": "m1", "pickId": "p1"}]
+
+
+def test_note_reply_to_synced_pick_becomes_pick_comment():
+    manager = _manager(
+        targets={PICK: {"id": "2", "activity_id": PICK, "object_data": {"id": PICK, "mesh_pick_id": "p1"}}},
+        members={ACTOR: "m1"},
+    )
+    manager._comment_batcher = _Recorder(result={"id": "c4"})
+    manager._activity_batcher = _Recorder()
+    note = {
+        "id": "https://remote.example/activities/7",
+        "type": "Create",
+        "actor": ACTOR,
+        "object": {"id": "https://remote.example/objects/note-7", "type": "Note", "content": "今天天氣真好", "inReplyTo": PICK},
+    }
+    assert asyncio.run(manager._convert_note_to_comment(note)) is True
+    assert manager._comment_batcher.items == [{"content": "今天天氣真好", "memberId": "m1", "pickId": "p1"}]
+
+
+# --- 同步後的 Activity 記錄 ---
+
+def test_synced_comment_records_its_mesh_id_for_later_likes():
+    manager = _manager(members={ACTOR: "m1"})
+    manager._comment_batcher = _Recorder(result={"id": "c9"})
+    manager._activity_batcher = _Recorder()
+    create = {
+        "id": "https://remote.example/activities/9",
+        "type": "Create",
+        "actor": ACTOR,
+        "object": {"id": COMMENT, "type": "Note", "content": "同意", "inReplyTo": "https://remote.example/objects/unknown"},
+    }
+    assert asyncio.run(manager._sync_comment_to_mesh(create)) is True
+    assert manager._activity_batcher.items[0]["object_data"]["mesh_comment_id"] == "c9"
+
+
+# --- 批次同步的預先查詢 ---
+
+def test_sync_activities_batch_prefetches_actors_and_stories_once():
+    manager = MeshSyncManager()
+    lookups = []
+
+    async def get_actors_by_usernames(usernames):
+        lookups.append(("actors", usernames))
+        return {name: {"id": f"actor-{name}", "mesh_member": {"id": f"m-{name}"}} for name in usernames}
+
+    async def get_stories_by_urls(urls):
+        lookups.append(("stories", urls))
+        return {}
+
+    async def get_actor_by_username(username):
+        raise AssertionError("actors in the batch must come from the prefetch")
+
+    async def get_activity_by_activity_id(activity_id):
+        return {"id": "1", "activity_id": activity_id}
+
+    manager.graphql_client = SimpleNamespace(
+        get_actors_by_usernames=get_actors_by_usernames,
+        get_stories_by_urls=get_stories_by_urls,
+        get_actor_by_username=get_actor_by_username,
+        get_activity_by_activity_id=get_activity_by_activity_id,
+        map=GraphQLClient.map,
+    )
+    manager._follow_batcher = _Recorder()
+    activities = [
+        {"id": "https://remote.example/follows/1", "type": "Follow", "actor": ACTOR, "object": "https://activity.readr.tw/users/bob"},
+        {"id": "https://remote.example/follows/2", "type": "Follow", "actor": "https://remote.example/users/carol", "object": "https://activity.readr.tw/users/bob"},
+        {"id": "https://remote.example/announces/1", "type": "Announce", "actor": ACTOR, "object": PICK},
+        {
+            "id": "https://remote.example/activities/8",
+            "type": "Create",
+            "actor": ACTOR,
+            "object": {"id": "https://remote.example/objects/note-8", "type": "Note", "content": "看這篇 https://readr.tw/story/1"},
+        },
+    ]
+    # Announce 沒有同步處理器，回報失敗；Create 的 Note 已同步過，直接視為完成
+    results = asyncio.run(manager.sync_activities_batch(activities))
+    assert lookups == [("actors", ["alice", "bob", "carol"]), ("stories", ["https://readr.tw/story/1"])]
+    assert results == [True, True, False, True]
+    assert manager._follow_batcher.items == [
+        {"followerId": "m-alice", "followingId": "m-bob"},
+        {"followerId": "m-carol", "followingId": "m-bob"},
+    ]
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    raise SystemExit(1 if failed else 0)